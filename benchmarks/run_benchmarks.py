@@ -0,0 +1,172 @@
+"""
+Benchmarks offline de los caminos calientes de MetHub sobre repos sintéticos.
+
+Uso:
+    python -m benchmarks.run_benchmarks --sizes 1000 100000 --output bench_results.json
+
+Cada etapa se mide en frío (cachés vaciadas) y, cuando aplica, en caliente.
+Se guarda el tiempo de pared y el pico de memoria de Python (tracemalloc), y
+los bytes por commit que ocupan en memoria los commits, las filas del
+timeline y el CommitStore.
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import platform
+import tempfile
+import tracemalloc
+
+import config.repo_selector as repo_selector
+from git_utils import commit_cache, push_log
+from git_utils.git_operations import get_local_commits, get_push_dates_from_log
+from git_utils.commit_cache import get_cached_commits, invalidar_cache
+from helpers import commit_store, fragment_cache, task_summary
+from helpers.time_utils import calcular_timeline
+from benchmarks.synthetic_repo import crear_repo
+
+SIZES_POR_DEFECTO = (1000, 100000)
+
+
+def _limpiar_caches(repo_path):                    # Deja todas las cachés en frío
+    import main
+    invalidar_cache(repo_path)
+    commit_cache._cache.memoria.clear()
+    push_log._estados.clear()
+    commit_store._cache.memoria.clear()
+    commit_store._podar_compartido(repo_path, None)      # También la copia mmap compartida entre procesos
+    main._timelines.clear()
+    fragment_cache.fragmentos.limpiar()
+    task_summary.invalidar_resumen(repo_path)
+
+
+def medir(nombre, fn, repeticiones=1):
+    """Ejecuta fn y devuelve {etapa, segundos (mejor de N), pico_memoria_bytes}."""
+    mejores = []
+    pico = 0
+    for _ in range(repeticiones):
+        tracemalloc.start()
+        t0 = time.perf_counter()
+        fn()
+        mejores.append(time.perf_counter() - t0)
+        pico = max(pico, tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+    return {"etapa": nombre, "segundos": min(mejores), "pico_memoria_bytes": pico}
+
+
+def retenida(fn):                                 # Bytes que siguen reservados mientras vive el resultado de fn
+    tracemalloc.start()
+    resultado = fn()                              # Referencia viva: sin ella el resultado se liberaría antes de medir
+    actual = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del resultado                                 # Se libera a propósito solo después de medir
+    return actual
+
+
+def memoria_por_commit(repo_path):
+    """Bytes por commit de cada estructura que se queda en memoria: {estructura: bytes}."""
+    _limpiar_caches(repo_path)
+    commits = get_local_commits(repo_path)
+    n = max(1, len(commits))
+    memoria = {
+        "commits": retenida(lambda: get_local_commits(repo_path)) / n,
+        "filas_timeline": retenida(lambda: calcular_timeline(commits)) / n,
+    }
+    if commit_store.NUMPY_DISPONIBLE:
+        memoria["commit_store"] = retenida(lambda: commit_store.CommitStore.from_commits(commits)) / n
+    return memoria
+
+
+def etapas(repo_path, repo_id):
+    import main
+    log_file = os.path.join(repo_path, "push_log.txt")
+    cliente = main.app.test_client()
+    resultados = []
+
+    resultados.append(medir("get_local_commits", lambda: get_local_commits(repo_path)))
+
+    _limpiar_caches(repo_path)
+    resultados.append(medir("get_cached_commits (frío)", lambda: get_cached_commits(repo_path)))
+    resultados.append(medir("get_cached_commits (caliente)", lambda: get_cached_commits(repo_path), 3))
+
+    _limpiar_caches(repo_path)
+    resultados.append(medir("get_push_dates_from_log (frío)", lambda: get_push_dates_from_log(log_file)))
+    resultados.append(medir("get_push_dates_from_log (caliente)", lambda: get_push_dates_from_log(log_file), 3))
+
+    commits = get_cached_commits(repo_path)
+    resultados.append(medir("calcular_timeline", lambda: calcular_timeline(commits)))
+    if commit_store.NUMPY_DISPONIBLE:
+        resultados.append(medir("CommitStore.from_commits", lambda: commit_store.CommitStore.from_commits(commits)))
+        store = commit_store.CommitStore.from_commits(commits)
+        resultados.append(medir("CommitStore.resumen", store.resumen, 3))
+
+    _limpiar_caches(repo_path)
+    resultados.append(medir("calcular_datos_repo (frío)", lambda: main.calcular_datos_repo(repo_path)))
+    resultados.append(medir("calcular_datos_repo (caliente)", lambda: main.calcular_datos_repo(repo_path), 3))
+
+    def render():
+        resp = cliente.post("/", data={"repo": repo_path, "action": "select"})
+        assert resp.status_code == 200, resp.status_code
+
+    _limpiar_caches(repo_path)
+    resultados.append(medir("render / (frío)", render))
+    resultados.append(medir("render / (caliente)", render, 3))
+
+    def pagina():
+        resp = cliente.get(f"/api/repos/{repo_id}/commits?limit=100")
+        assert resp.status_code == 200, resp.status_code
+
+    resultados.append(medir("/api/repos/<id>/commits (caliente)", pagina, 3))
+    return resultados
+
+
+def ejecutar(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=SIZES_POR_DEFECTO,
+                        help="Número de commits de cada repo sintético (p. ej. 1000 100000 1000000)")
+    parser.add_argument("--workdir", default=os.path.join(tempfile.gettempdir(), "methub_bench"),
+                        help="Carpeta donde se generan (y reutilizan) los repos sintéticos")
+    parser.add_argument("--output", default="bench_results.json", help="Fichero JSON de resultados")
+    args = parser.parse_args(argv)
+
+    os.makedirs(args.workdir, exist_ok=True)
+    repo_selector.BASE_DIR = args.workdir               # La app descubre los repos sintéticos como si fueran reales
+
+    informe = {
+        "python": sys.version.split()[0],
+        "plataforma": platform.platform(),
+        "numpy": commit_store.NUMPY_DISPONIBLE,
+        "fecha": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "repos": []
+    }
+
+    for n in args.sizes:
+        nombre = f"bench-{n}"
+        t0 = time.perf_counter()
+        repo_path = crear_repo(os.path.join(args.workdir, nombre), n)
+        generado = time.perf_counter() - t0
+        repo_id = repo_selector.repo_id(nombre)
+        repo_selector.reescanear_repositorios()
+
+        print(f"\n== {nombre} ({n} commits, generado en {generado:.1f}s)")
+        resultados = etapas(repo_path, repo_id)
+        for r in resultados:
+            print(f"  {r['etapa']:<40} {r['segundos'] * 1000:>10.1f} ms  {r['pico_memoria_bytes'] / 1e6:>8.1f} MB")
+        memoria = memoria_por_commit(repo_path)
+        for estructura, bytes_commit in memoria.items():
+            print(f"  memoria por commit: {estructura:<20} {bytes_commit:>10.1f} B")
+        informe["repos"].append({
+            "commits": n,
+            "path": repo_path,
+            "etapas": resultados,
+            "memoria_por_commit_bytes": memoria
+        })
+
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(informe, f, ensure_ascii=False, indent=2)
+    print(f"\nResultados en {args.output}")
+
+
+if __name__ == "__main__":
+    ejecutar()
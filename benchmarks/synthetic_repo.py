@@ -0,0 +1,75 @@
+import os                           # Rutas del repo sintético
+import random                       # Mezcla reproducible de mensajes
+import subprocess                   # git init / fast-import
+from datetime import datetime, timezone
+
+INICIO = int(datetime(2024, 1, 1, 8, 0, tzinfo=timezone.utc).timestamp())   # Fecha del primer commit sintético
+
+
+def _mensajes(n, rng):
+    """
+    Genera n mensajes con una mezcla realista: tareas +nombre / -nombre con
+    commits normales en medio y un [END] en el último commit.
+    """
+    abierta = None
+    for i in range(n):
+        if i == n - 1:
+            yield "Cierre del proyecto [END]"
+        elif abierta is None and rng.random() < 0.35:
+            abierta = f"tarea-{i}"
+            yield f"+{abierta}"
+        elif abierta is not None and rng.random() < 0.4:
+            yield f"-{abierta} | terminada"
+            abierta = None
+        else:
+            yield f"commit normal {i}"
+
+
+def crear_repo(path, n_commits, semilla=0, push_cada=50):
+    """
+    Crea (o reutiliza) en path un repo git con n_commits commits vacíos vía
+    git fast-import y un push_log.txt con un push cada push_cada commits,
+    más alguna línea en blanco o mal formada como las que aparecen en la práctica.
+    """
+    marca = os.path.join(path, ".git", "methub_bench_size")
+    if os.path.exists(marca):
+        with open(marca, encoding="utf-8") as f:
+            if f.read().strip() == str(n_commits):
+                return path                                  # Ya generado con este tamaño
+
+    os.makedirs(path, exist_ok=True)
+    subprocess.check_call(["git", "init", "-q", "-b", "main", path])
+    rng = random.Random(semilla)
+
+    proc = subprocess.Popen(
+        ["git", "-C", path, "fast-import", "--quiet", "--force"],
+        stdin=subprocess.PIPE
+    )
+    ts = INICIO
+    for i, msg in enumerate(_mensajes(n_commits, rng)):
+        ts += rng.randint(60, 3 * 3600)                      # Entre 1 minuto y 3 horas entre commits
+        data = msg.encode("utf-8")
+        bloque = (
+            f"commit refs/heads/main\n"
+            f"mark :{i + 1}\n"
+            f"committer Bench <bench@example.com> {ts} +0100\n"
+            f"data {len(data)}\n"
+        ).encode("utf-8") + data + b"\n"
+        if i:
+            bloque += f"from :{i}\n".encode("utf-8")
+        proc.stdin.write(bloque + b"\n")
+    proc.stdin.close()
+    if proc.wait():
+        raise RuntimeError("git fast-import falló")
+    subprocess.check_call(["git", "-C", path, "symbolic-ref", "HEAD", "refs/heads/main"])
+
+    shas = subprocess.check_output(["git", "-C", path, "rev-list", "--reverse", "HEAD"], text=True).split()
+    with open(os.path.join(path, "push_log.txt"), "w", encoding="utf-8") as f:
+        for i, sha in enumerate(shas[push_cada - 1::push_cada]):
+            f.write(f"{sha} {datetime.fromtimestamp(INICIO + i * 3600).isoformat()}\n")
+            if i % 100 == 99:
+                f.write("\n" if i % 200 == 99 else "linea mal formada\n")
+
+    with open(marca, "w", encoding="utf-8") as f:
+        f.write(str(n_commits))
+    return path
@@ -0,0 +1,40 @@
+import time
+
+from helpers.startup_timing import marcar
+
+
+class LazyPages:
+    """
+    Registro de páginas que se construyen la primera vez que se muestran.
+
+    El controlador de la ventana lo usa en lugar de instanciar todas las
+    páginas al arrancar:
+        self.paginas = LazyPages(contenedor, self, {"Tareas": TareasPage, "Commits": CommitsPage})
+        def show_page(self, nombre): self.paginas.mostrar(nombre)
+        def toggle_theme(self): ...; self.paginas.apply_theme()
+    """
+
+    def __init__(self, contenedor, controller, clases):
+        self.contenedor = contenedor
+        self.controller = controller
+        self.clases = dict(clases)            # nombre -> clase de página (todavía sin crear)
+        self.paginas = {}                     # nombre -> instancia ya creada
+
+    def obtener(self, nombre):                # Crea la página si hace falta (y apunta cuánto tardó)
+        pagina = self.paginas.get(nombre)
+        if pagina is None:
+            t0 = time.perf_counter()
+            pagina = self.clases[nombre](self.contenedor, self.controller)
+            pagina.grid(row=0, column=0, sticky="nsew")
+            self.paginas[nombre] = pagina
+            marcar(f"página {nombre} ({(time.perf_counter() - t0) * 1000:.0f} ms)")
+        return pagina
+
+    def mostrar(self, nombre):
+        pagina = self.obtener(nombre)
+        pagina.tkraise()
+        return pagina
+
+    def apply_theme(self):                    # Las páginas aún no creadas tomarán el tema al construirse
+        for pagina in self.paginas.values():
+            pagina.apply_theme()
@@ -1,18 +1,54 @@
 import os
+import time
+import hashlib
+import threading
+
+from config.settings import REPO_SCAN_TTL
+from helpers.metrics import registrar_cache
 
 BASE_DIR = r"C:\Users\danie\Desktop\Proyectos\Funcionan"   #Define carpeta donde se buscan los repos en modo raw string(r"") para evitar problemas con barras invertidas\
 
+_escaneo = {"mtime": None, "hora": 0.0, "repos": None}     #Último escaneo: mtime de BASE_DIR, momento del escaneo y resultado
+_lock = threading.Lock()                                   #Flask y los hilos de Tkinter pueden pedir repos a la vez
+
 
 def es_repo_git(path):
     return os.path.isdir(os.path.join(path, ".git"))       #Verifica que carpetas contienen la carpeta .git dentro de BASE_DIR y construye las rutas para que obtener_repositorios las recorra
 
 
-def obtener_repositorios() -> dict | None:                 #Define la función que devuelve un diccionario de repositorios o None
-    
-    repos = {                                                                                             #Crea un diccionario con todos los repositorios detectados
-        str(idx): os.path.join(BASE_DIR, folder)                                                          #Clave = índice como string, Valor = ruta completa del folder
-        for idx, folder in enumerate(os.listdir(BASE_DIR), start=1)                                       #Itera sobre todas las carpetas en BASE_DIR con índice
-        if os.path.isdir(os.path.join(BASE_DIR, folder)) and es_repo_git(os.path.join(BASE_DIR, folder))  #Solo agrega carpetas que sean directorios y contengan .git
-    }
-    return repos or None                                                                                  #Devuelve el diccionario si tiene elementos, si no devuelve None
+def repo_id(folder):                                       #Id estable derivado del nombre de la carpeta: no cambia al añadir o quitar otros repos
+    return hashlib.sha1(folder.encode("utf-8")).hexdigest()[:8]
+
+
+def _escanear():                                           #Recorre BASE_DIR y devuelve {id: ruta} ordenado por nombre de carpeta
+    repos = {}
+    for folder in sorted(os.listdir(BASE_DIR)):                                                           #Itera sobre todas las carpetas en BASE_DIR en orden estable
+        path = os.path.join(BASE_DIR, folder)
+        if os.path.isdir(path) and es_repo_git(path):                                                     #Solo agrega carpetas que sean directorios y contengan .git
+            repos[repo_id(folder)] = path                                                                 #Clave = id estable, Valor = ruta completa del folder
+    return repos
+
+
+def obtener_repositorios(forzar=False) -> dict | None:     #Define la función que devuelve un diccionario de repositorios o None
+    """
+    Devuelve {id: ruta} de los repos de BASE_DIR reutilizando el último escaneo
+    mientras no cambie el mtime de BASE_DIR ni pase REPO_SCAN_TTL.
+    forzar=True vuelve a escanear siempre.
+    """
+    try:
+        mtime = os.stat(BASE_DIR).st_mtime                                                                #Un único stat para saber si se añadió/borró/renombró algo
+    except OSError:
+        return None                                                                                       #BASE_DIR no existe o no es accesible
+
+    with _lock:
+        caducado = time.monotonic() - _escaneo["hora"] > REPO_SCAN_TTL
+        reescanear = forzar or caducado or _escaneo["repos"] is None or _escaneo["mtime"] != mtime
+        registrar_cache("repos", not reescanear)
+        if reescanear:
+            _escaneo.update(mtime=mtime, hora=time.monotonic(), repos=_escanear())
+        repos = _escaneo["repos"]
+    return dict(repos) or None                                                                            #Devuelve el diccionario si tiene elementos, si no devuelve None
+
 
+def reescanear_repositorios() -> dict | None:              #Gancho para forzar un escaneo manual (botón de carpeta, /api/repos/rescan)
+    return obtener_repositorios(forzar=True)
@@ -1,5 +1,80 @@
 # config/settings.py
+import os
+import tempfile
+
 # Rama por defecto para hacer push
 
 BRANCH = "main"   #Define una variable global que indica cuál es la rama de Git donde se harán los pushes por defecto
 
+
+# Caché de commits por repositorio (se guarda dentro de .git para no ensuciar el árbol de trabajo)
+COMMIT_CACHE_FILE = "methub_commits.jsonl"  #Nombre del fichero de caché dentro de <repo>/.git
+COMMIT_CACHE_VERSION = 3                    #Se incrementa si cambia el formato guardado para forzar reconstrucción
+
+# Paginación de la tabla de commits en la web
+PAGE_SIZE = 100                             #Filas por página que se envían al navegador
+MAX_PAGE_SIZE = 500                         #Límite superior para el parámetro ?limit= de la API
+
+# Cola de pushes en segundo plano
+PUSH_WORKERS = 4                            #Pushes simultáneos como máximo (siempre uno por repo a la vez)
+PUSH_JOBS_DB = "push_jobs.sqlite3"          #Base (dentro de SHARED_CACHE_DIR) con el estado de los pushes para todos los procesos
+PUSH_JOBS_MAX = 200                         #Trabajos terminados que se conservan para consultar su estado
+PUSH_POLL_MS = 500                          #Cada cuánto revisa la ventana Tkinter si el push terminó
+PUSH_POLL_LIMIT = 600                       #Segundos sin ningún avance tras los que la ventana da el push por fallido
+PUSH_LOCK_FILE = "methub_push.lock"         #Lock dentro de <repo>/.git: un solo push por repo aunque haya varios procesos
+PUSH_LOCK_RETRY = 1.0                       #Segundos entre intentos si otro proceso está haciendo push del mismo repo
+PUSH_LOCK_STALE = 600                       #Segundos sin renovar tras los que un lock de push se considera abandonado
+PUSH_TIMEOUT = 120                          #Segundos máximos de cada git push, suelto o masivo (luego se cuenta como fallo)
+PUSH_LOTES_MAX = 50                         #Pushes masivos terminados que se conservan para consultar su informe
+
+# Dashboard de todos los repositorios
+DASHBOARD_WORKERS = 32                      #Tope de repos analizados en paralelo (el pool se dimensiona por número de repos)
+
+# Descubrimiento de repositorios
+REPO_SCAN_TTL = 300                         #Segundos que vale el escaneo de BASE_DIR aunque su mtime no cambie
+
+# Carga del Treeview de commits en Tkinter
+TREE_CHUNK_SIZE = 500                       #Filas insertadas por cada vuelta del bucle de eventos
+TREE_POLL_MS = 50                           #Cada cuánto mira la ventana si el hilo de carga terminó
+
+# Instrumentación
+SERVER_TIMING = True                        #Añade la cabecera Server-Timing con los tiempos por etapa de cada petición
+
+# Pool de procesos git persistentes (git cat-file --batch / --batch-check)
+GIT_POOL_ENABLED = True                     #Resolver refs y leer objetos con procesos vivos en lugar de lanzar git cada vez
+GIT_POOL_SIZE = 2                           #Procesos como máximo por repo y modo
+GIT_POOL_IDLE_SECONDS = 300                 #Los procesos sin uso durante este tiempo se cierran
+
+# Backend de lectura de commits
+GIT_BACKEND = "subprocess"                  #"subprocess" = git log; "python" = lector en Python de .git (sin procesos, vía mmap)
+
+# Caché de fragmentos HTML renderizados (resumen y tabla de commits de index.html)
+FRAGMENT_CACHE_MAX_BYTES = 32 * 1024 * 1024  #Memoria máxima de los fragmentos guardados; se desalojan los menos usados
+
+# Resumen de tareas materializado por repositorio (también dentro de .git)
+TASK_SUMMARY_FILE = "methub_resumen.json"   #Totales y tarea abierta guardados para sumar solo los commits nuevos
+TASK_SUMMARY_VERSION = 2                    #Se incrementa si cambia el formato o las reglas de emparejado
+
+# Actualizaciones en vivo (vigilancia de refs y push_log.txt)
+WATCH_INTERVAL = 1.0                        #Segundos entre cada stat de .git/HEAD, refs y push_log.txt de los repos abiertos
+SSE_KEEPALIVE = 15                          #Segundos sin cambios tras los que se envía un comentario para mantener viva la conexión
+WATCH_POLL_MS = 500                         #Cada cuánto mira la ventana Tkinter si el vigilante avisó de cambios
+
+# Modo producción (wsgi.py): servidor WSGI con varios procesos
+WEB_BIND = "127.0.0.1:8000"                 #Dirección y puerto donde escucha el servidor de producción
+WEB_WORKERS = 4                             #Procesos de gunicorn (waitress, en Windows, usa un solo proceso)
+WEB_THREADS = 8                             #Hilos por proceso (las conexiones SSE ocupan uno cada una)
+
+# Caché compartida entre procesos: columnas del CommitStore en ficheros .npy abiertos con mmap
+SHARED_CACHE_ENABLED = True                 #Todos los procesos leen la misma copia en disco (la caché de páginas del SO la comparte)
+SHARED_CACHE_DIR = os.path.join(tempfile.gettempdir(), "methub_cache")   #Carpeta de la caché compartida
+SHARED_CACHE_LOCK_TIMEOUT = 120             #Segundos tras los que un lock de construcción se considera abandonado
+
+# Lista de tareas de Tkinter (vista virtualizada)
+TASK_ROW_HEIGHT = 34                        #Alto en píxeles de cada fila; solo se crean las filas que caben en pantalla
+
+# Persistencia de la lista de tareas (snapshot + diario de operaciones)
+TASKS_DIR = os.path.join(os.path.expanduser("~"), ".methub")   #Carpeta donde se guardan las tareas de TareasPage
+TASKS_SNAPSHOT_FILE = "tareas.json"         #Estado completo en la última compactación
+TASKS_JOURNAL_FILE = "tareas.log"           #Operaciones (add/toggle/delete) posteriores al snapshot, una por línea
+TASKS_COMPACT_EVERY = 1000                  #Operaciones en el diario tras las que se reescribe el snapshot
@@ -0,0 +1,136 @@
+import os                           # Para construir la ruta del fichero de caché
+import json                         # Formato de la caché en disco
+
+from git_utils.git_operations import (
+    get_local_commits,
+    get_head_sha,
+    is_ancestor,
+    tiene_merges
+)
+from git_utils.commit_record import Commit
+from config.settings import COMMIT_CACHE_FILE, COMMIT_CACHE_VERSION
+from helpers.metrics import registrar_cache
+from helpers.cache_utils import CachePorRepo, escribir_atomico
+
+_cache = CachePorRepo()             # memoria: repo_path -> {"head": sha, "commits": [...], "limpio": bool}
+
+
+def _cache_path(repo_path):                                      # Ruta del fichero de caché dentro de .git
+    return os.path.join(repo_path, ".git", COMMIT_CACHE_FILE)
+
+
+def _leer_cache(repo_path):
+    """
+    Lee la caché en disco; None si no existe o no es válida. Formato JSON lines:
+        {"version": N}                      cabecera
+        [sha, ts, tz, mensaje]              commits de un tramo (orden de git log)
+        {"base": sha | null, "head": sha}   cierra el tramo: commits de base..head
+    Los tramos se añaden al final cada vez que HEAD avanza. Un tramo cuya base
+    no es el head anterior (otro proceso añadió el mismo rango) se ignora, y uno
+    sin cierre (escritura cortada) deja la caché marcada para reescribirse.
+    """
+    path = _cache_path(repo_path)
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            lineas = f.read().split("\n")
+    except OSError:
+        return None
+    try:
+        if json.loads(lineas[0]).get("version") != COMMIT_CACHE_VERSION:
+            return None
+    except (ValueError, AttributeError):
+        return None                                              # Fichero corrupto: se reconstruye
+
+    tramos, pendiente, head, limpio = [], [], None, True
+    for linea in lineas[1:]:
+        if not linea:
+            continue
+        try:
+            dato = json.loads(linea)
+            if isinstance(dato, list):
+                pendiente.append(Commit.de_lista(dato))
+                continue
+            base, nuevo = dato.get("base"), dato["head"]
+        except (ValueError, KeyError, TypeError, AttributeError):
+            limpio = False                                       # Línea cortada: se ignora lo que sigue
+            break
+        if base == head:
+            tramos.append(pendiente)
+            head = nuevo
+        pendiente = []
+    if pendiente:
+        limpio = False
+    if head is None:
+        return None
+    commits = [c for tramo in reversed(tramos) for c in tramo]   # El tramo más nuevo va delante, como en git log
+    return {"head": head, "commits": commits, "limpio": limpio}
+
+
+def _tramo(base, head, commits):                                 # Líneas de un tramo (commits + cierre)
+    lineas = [json.dumps(c.a_lista(), ensure_ascii=False) for c in commits]
+    lineas.append(json.dumps({"base": base, "head": head}))
+    return "".join(f"{linea}\n" for linea in lineas)
+
+
+def _guardar_cache(repo_path, head, commits):                    # Reescribe la caché completa de forma atómica
+    cabecera = json.dumps({"version": COMMIT_CACHE_VERSION}) + "\n"
+    escribir_atomico(_cache_path(repo_path), lambda f: f.write(cabecera + _tramo(None, head, commits)))
+
+
+def _anexar_cache(repo_path, base, head, nuevos):                # Añade solo el tramo base..head: O(commits nuevos)
+    try:
+        fd = os.open(_cache_path(repo_path), os.O_WRONLY | os.O_APPEND)
+    except OSError:
+        return False
+    try:
+        os.write(fd, _tramo(base, head, nuevos).encode("utf-8"))   # Una sola escritura: los tramos no se mezclan
+        return True
+    except OSError:
+        return False
+    finally:
+        os.close(fd)
+
+
+def get_cached_commits(repo_path):
+    """
+    Devuelve los commits del repo (mismo formato y orden que get_local_commits)
+    usando una caché persistente indexada por el SHA de HEAD.
+
+    - HEAD igual al guardado: no se ejecuta git log.
+    - HEAD avanzó en línea recta (el HEAD guardado es ancestro y old..HEAD no
+      trae merges): solo se lee ese rango y solo ese tramo se añade al final
+      del fichero. Sin merges los commits nuevos van todos delante de los
+      viejos en git log, así que el orden es el mismo que una lectura completa.
+    - HEAD avanzó con un merge (las ramas unidas pueden intercalarse por fecha
+      con la historia guardada) o historia reescrita (rebase, force-push,
+      reset): reconstrucción completa.
+    """
+    head = get_head_sha(repo_path)
+    if head is None:
+        return []                                                # Repo sin commits
+
+    with _cache.lock(repo_path):
+        cache = _cache.memoria.get(repo_path) or _leer_cache(repo_path)
+
+        if cache and cache["head"] == head:
+            registrar_cache("commits", True)
+            _cache.memoria[repo_path] = cache
+            return list(cache["commits"])
+        registrar_cache("commits", False)
+
+        rango = f"{cache['head']}..{head}" if cache else None
+        if cache and is_ancestor(repo_path, cache["head"], head) and not tiene_merges(repo_path, rango):
+            nuevos = get_local_commits(repo_path, rango)
+            commits = nuevos + cache["commits"]                  # git log lista del más nuevo al más antiguo
+            if not (cache["limpio"] and _anexar_cache(repo_path, cache["head"], head, nuevos)):
+                _guardar_cache(repo_path, head, commits)
+        else:
+            commits = get_local_commits(repo_path, head)
+            _guardar_cache(repo_path, head, commits)             # Merge o historia reescrita: el fichero se rehace entero
+
+        _cache.memoria[repo_path] = {"head": head, "commits": commits, "limpio": True}
+        return list(commits)
+
+
+def invalidar_cache(repo_path):
+    _cache.invalidar(repo_path, _cache_path(repo_path))
@@ -0,0 +1,93 @@
+import sys                                        # sys.intern para compartir los SHA entre cachés
+from datetime import datetime, timedelta, timezone
+
+_zonas = {}                                       # offset en minutos -> tzinfo (uno compartido por zona)
+
+
+def zona(minutos):
+    tz = _zonas.get(minutos)
+    if tz is None:
+        tz = _zonas.setdefault(minutos, timezone(timedelta(minutes=minutos)))
+    return tz
+
+
+def parse_offset(date_str):                       # '...+02:00' / '...-05:30' / '...Z' -> minutos
+    if date_str.endswith("Z"):
+        return 0
+    signo = -1 if date_str[-6] == "-" else 1
+    return signo * (int(date_str[-5:-3]) * 60 + int(date_str[-2:]))
+
+
+class Commit:
+    """
+    Registro compacto de un commit (sustituye al dict sha/commit_date/message):
+        sha:     SHA completo, internado para que la caché de commits, el índice
+                 del push_log y las filas compartan el mismo objeto
+        ts:      fecha del commit en epoch UTC (int)
+        tz:      offset de la zona del commit en minutos (int pequeño, cacheado por Python)
+        message: asunto del commit (%s)
+    La fecha ISO y el datetime se calculan al pedirlos en lugar de guardarse.
+    """
+
+    __slots__ = ("sha", "ts", "tz", "message")
+
+    def __init__(self, sha, ts, tz, message):
+        self.sha = sys.intern(sha)
+        self.ts = ts
+        self.tz = tz
+        self.message = message
+
+    @property
+    def sha_corto(self):
+        return self.sha[:7]
+
+    @property
+    def dt(self):                                 # datetime con la zona original del commit
+        return datetime.fromtimestamp(self.ts, zona(self.tz))
+
+    @property
+    def commit_date(self):                        # Igual que %cI: 'YYYY-MM-DDTHH:MM:SS±HH:MM'
+        return self.dt.isoformat()
+
+    def a_lista(self):                            # Forma compacta para la caché en disco
+        return [self.sha, self.ts, self.tz, self.message]
+
+    @classmethod
+    def de_lista(cls, datos):
+        return cls(*datos)
+
+    def __eq__(self, otro):
+        return isinstance(otro, Commit) and self.a_lista() == otro.a_lista()
+
+    def __repr__(self):
+        return f"Commit({self.sha[:7]}, {self.commit_date}, {self.message!r})"
+
+
+class FilaTimeline:
+    """
+    Fila del timeline: el Commit más la duración de la tarea que cierra
+    (None si no cierra ninguna). Expone sha/message/dt del commit para que
+    Flask, las plantillas y Tkinter lean las filas igual que los commits.
+    """
+
+    __slots__ = ("commit", "duracion")
+
+    def __init__(self, commit, duracion=None):
+        self.commit = commit
+        self.duracion = duracion
+
+    @property
+    def sha(self):
+        return self.commit.sha
+
+    @property
+    def message(self):
+        return self.commit.message
+
+    @property
+    def ts(self):
+        return self.commit.ts
+
+    @property
+    def dt(self):
+        return self.commit.dt
@@ -1,85 +1,176 @@
 import os                           # Para manejar rutas y verificar existencia de archivos
+import time                         # Para medir la duración de cada proceso git
 import subprocess                   # Para ejecutar comandos de Git desde Python
+from contextlib import contextmanager
 from datetime import datetime       # Para trabajar con fechas y horas
 
-def get_local_commits(repo_path):        # Obtiene commits locales del repositorio
+from git_utils.push_log import leer_push_log, registrar_push   # Lector incremental y escritura segura de push_log.txt
+from git_utils.commit_record import Commit, parse_offset   # Registro compacto de commit (__slots__)
+from git_utils.git_pool import resolver_ref, GitPoolError   # Pool de git cat-file persistentes
+from helpers.metrics import registrar_subproceso   # Cuenta y cronometra cada proceso git
+from git_utils import git_reader             # Lector en Python puro de .git (opcional, GIT_BACKEND = "python")
+from config.settings import GIT_POOL_ENABLED, GIT_BACKEND
+
+LOG_FIELD_SEP = "\x1f"                  # Separador de campos (unit separator): no aparece en mensajes normales
+LOG_CHUNK_SIZE = 64 * 1024              # Bytes leídos de la tubería de git en cada vuelta
+
+
+class GitPushError(Exception):
+    """git push falló (rechazo, red, credenciales) o superó su tiempo máximo."""
+
+
+@contextmanager
+def _medir_git(subcomando):                 # Registra duración y errores de un proceso git en /metrics
+    t0 = time.perf_counter()
+    error = False
+    try:
+        yield
+    except (subprocess.CalledProcessError, subprocess.TimeoutExpired):
+        error = True
+        raise
+    finally:
+        registrar_subproceso(subcomando, time.perf_counter() - t0, error)
+
+
+def iter_local_commits(repo_path, rev_range=None):   # Genera los commits a medida que git log los produce
+    if GIT_BACKEND == "python":
+        try:
+            commits = list(git_reader.iter_commits(repo_path, rev_range))   # Entero antes de emitir: un fallo a mitad no deja la salida a medias
+        except git_reader.GitReaderError:
+            pass                                     # Repo no soportado u objeto ilegible: se usa git log
+        else:
+            yield from commits
+            return
+
     cmd = [                              #Construye el comando Git para listar los commits
         "git", 
         "-C", 
         repo_path,                       # Indica que el comando se ejecuta en ese repositorio
         "log", 
-        "--pretty=format:%H|%cI|%s"      # Devuelve por cada commit hash completo, fecha en ISO 8601 y mensaje
+        "-z",                            # Cada commit termina en NUL en lugar de salto de línea
+        "--pretty=format:%H%x1f%ct%x1f%cI%x1f%s"   # Hash, epoch, fecha ISO 8601 (por su zona) y mensaje separados por \x1f
     ]
-    result = subprocess.check_output(    # Ejecuta el comando git log
-        cmd, 
-        text=True,                       # Captura la salida como texto
-        encoding="utf-8",                
-        errors="ignore"                  # Ignora errores de codificación
-    )
-    
-    commits = []                             # Lista vacía para almacenar commits
-    for line in result.splitlines():         # Recorre cada línea de salida
-        sha, date, msg = line.split("|", 2)  # Separa la línea en 3 partes has, fecha y mensaje
-        commits.append({                     # Lo agrega como diccionario
-            "sha": sha, 
-            "commit_date": date, 
-            "message": msg
-        })
-    return commits                           # Devuelve la lista de commits
+    if rev_range:
+        cmd.append(rev_range)            # Limita el log al rango indicado (p. ej. "<sha_viejo>..<sha_nuevo>")
+
+    t0 = time.perf_counter()
+    proc = subprocess.Popen(cmd, stdout=subprocess.PIPE)
+    terminado = False
+    try:
+        pendiente = b""                                      # Resto de un registro partido entre dos lecturas
+        while True:
+            chunk = proc.stdout.read1(LOG_CHUNK_SIZE)
+            if not chunk:
+                break
+            registros = (pendiente + chunk).split(b"\0")
+            pendiente = registros.pop()                       # El último puede estar incompleto
+            for registro in registros:
+                yield _parse_log_record(registro)
+        if pendiente:
+            yield _parse_log_record(pendiente)
+        terminado = True
+    finally:
+        if not terminado:
+            proc.kill()                                      # El consumidor paró antes: no dejar git colgado
+        proc.stdout.close()
+        returncode = proc.wait()
+        registrar_subproceso("log", time.perf_counter() - t0, error=terminado and returncode != 0)
+    if returncode:
+        raise subprocess.CalledProcessError(returncode, cmd)  # Mismo error que lanzaba check_output
+
+
+def _parse_log_record(registro):                             # Convierte un registro de git log en un Commit compacto
+    sha, epoch, date, msg = registro.decode("utf-8", errors="ignore").split(LOG_FIELD_SEP, 3)
+    return Commit(sha, int(epoch), parse_offset(date), msg)
+
+
+def get_local_commits(repo_path, rev_range=None):   # Obtiene commits locales del repositorio (opcionalmente solo un rango old..new)
+    return list(iter_local_commits(repo_path, rev_range))    # Devuelve la lista de commits
+
+
+def get_head_sha(repo_path):             # Obtiene el SHA del commit al que apunta HEAD
+    if GIT_POOL_ENABLED:
+        try:
+            return resolver_ref(repo_path, "HEAD")   # Proceso git ya vivo: sin fork/exec por consulta
+        except (GitPoolError, OSError):
+            pass                                     # Si el pool falla se cae al rev-parse de siempre
+    try:
+        with _medir_git("rev-parse"):
+            return subprocess.check_output(
+                ["git", "-C", repo_path, "rev-parse", "HEAD"],
+                text=True,
+                stderr=subprocess.DEVNULL    # Un repo sin commits no tiene HEAD válido
+            ).strip()
+    except subprocess.CalledProcessError:
+        return None                          # Repo vacío o ruta inválida
+
+
+def is_ancestor(repo_path, old_sha, new_sha):   # Indica si old_sha sigue en la historia de new_sha (HEAD solo avanzó)
+    with _medir_git("merge-base"):
+        return subprocess.call(
+            ["git", "-C", repo_path, "merge-base", "--is-ancestor", old_sha, new_sha],
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL        # Si old_sha ya no existe (gc tras rebase) git falla y devolvemos False
+        ) == 0
+
+
+def tiene_merges(repo_path, rev_range):        # Indica si el rango trae algún merge (True también si git falla)
+    with _medir_git("rev-list"):
+        proc = subprocess.run(
+            ["git", "-C", repo_path, "rev-list", "--merges", "-n", "1", rev_range],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            text=True
+        )
+    return proc.returncode != 0 or bool(proc.stdout.strip())
 
 
 def get_push_dates_from_log(log_file):          # Lee las fechas de push desde el archivo de log 
-    push_dates = {}                             # Diccionario vacío para almacenar fechas
-    
-    if not os.path.exists(log_file):            
-        return push_dates                       # Si no existe el log, retorna diccionario vacío
-    
-    with open(                                  #Lee el archivo 
-        log_file, 
-        "r", 
-        encoding="utf-8"
-    ) as f:
-        for line in f:
-            sha, date = line.strip().split()    # Cada línea tiene SHA y fecha separados
-            push_dates[sha] = date              # Guarda en el diccionario
-    
-    return push_dates                           # Devuelve el diccionario con fechas de push
-
-
-def git_push_and_log(                           
-        repo_path, 
+    return leer_push_log(log_file)              # Solo parsea las líneas añadidas desde la última lectura y salta las mal formadas
+
+
+def git_push_and_log(
+        repo_path,
         branch,                                            # Hace git push
-        log_file                                           # Guarda registro en log
+        log_file,                                          # Guarda registro en log
+        timeout=None                                       # Segundos máximos del push (None: sin límite)
 ):
+    """
+    Hace git push origin <branch> y registra el SHA de HEAD en log_file.
+    Devuelve (sha, fecha) si se subió algo, o None si la rama ya estaba al día
+    (entonces no se añade nada al log). Lanza GitPushError si el push falla
+    o supera el timeout.
+    """
+    env = None
+    if timeout is not None:                                # Con plazo no se puede esperar a que alguien teclee credenciales
+        env = {**os.environ, "GIT_TERMINAL_PROMPT": "0"}
     try:
-        subprocess.check_call([                            # Intenta ejecutar git push origin <branch> en el repo
-            "git", 
-            "-C", 
-            repo_path, 
-            "push", 
-            "origin", 
-            branch
-        ])
-        push_time = datetime.now().isoformat()             # Guarda la fecha y hora actual del push
-        
-        last_commit_sha = subprocess.check_output([        # Obtiene el hash del último commit en la rama actual después del push
-            "git", 
-            "-C", 
-            repo_path, 
-            "rev-parse", 
-            "HEAD"
-        ], 
+        with _medir_git("push"):
+            salida = subprocess.run(                       # --porcelain: una línea por ref, "=" si ya estaba al día
+                ["git", "-C", repo_path, "push", "--porcelain", "origin", branch],
+                capture_output=True,
+                text=True,
+                timeout=timeout,
+                env=env,
+                check=True
+            ).stdout
+    except subprocess.TimeoutExpired:
+        raise GitPushError(f"git push no terminó en {timeout}s")
+    except subprocess.CalledProcessError as e:
+        lineas = (e.stderr or "").strip().splitlines()
+        detalle = next((l for l in lineas if l.startswith(("fatal:", "error:"))), lineas[-1] if lineas else None)
+        raise GitPushError(detalle or f"git push terminó con código {e.returncode}")
+
+    refs = [linea.split("\t") for linea in salida.splitlines() if "\t" in linea]
+    if refs and all(partes[0] == "=" for partes in refs):
+        return None                                        # Nada que subir
+
+    push_time = datetime.now().isoformat()                 # Guarda la fecha y hora actual del push
+    with _medir_git("rev-parse"):
+        last_commit_sha = subprocess.check_output(         # Obtiene el hash del último commit en la rama actual después del push
+            ["git", "-C", repo_path, "rev-parse", "HEAD"],
             text=True
         ).strip()
-        
-        with open(                                         # Añade SHA y fecha al log
-            log_file, 
-            "a", 
-            encoding="utf-8"
-        ) as f:
-            f.write(f"{last_commit_sha} {push_time}\n")
-        
-        return last_commit_sha, push_time                  # Devuelve SHA y fecha del push
 
-    except subprocess.CalledProcessError:
-        return None                                        # Si falla el git push, devuelve None
+    registrar_push(log_file, last_commit_sha, push_time)   # Añade SHA y fecha al log sin mezclarse con otros procesos
+    return last_commit_sha, push_time                      # Devuelve SHA y fecha del push
@@ -0,0 +1,170 @@
+import time                                       # Marca de último uso para desalojar procesos ociosos
+import atexit                                     # Cerrar los procesos al salir
+import threading                                  # Varios hilos comparten el pool
+import subprocess                                 # Procesos git cat-file persistentes
+
+from helpers.metrics import observar, registrar_cache, registrar_subproceso
+from config.settings import GIT_POOL_SIZE, GIT_POOL_IDLE_SECONDS
+
+BATCH = "--batch"                                 # Devuelve cabecera + contenido del objeto
+BATCH_CHECK = "--batch-check"                     # Solo cabecera: "<sha> <tipo> <tamaño>"
+
+
+class GitPoolError(Exception):
+    """El proceso git del pool murió o respondió algo inesperado."""
+
+
+class GitBatchProcess:
+    """Un `git cat-file --batch[-check]` vivo que atiende consultas por sus tuberías."""
+
+    def __init__(self, repo_path, modo):
+        self.repo_path = repo_path
+        self.modo = modo
+        t0 = time.perf_counter()
+        self.proc = subprocess.Popen(
+            ["git", "-C", repo_path, "cat-file", modo],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL
+        )
+        registrar_subproceso(f"cat-file {modo}", time.perf_counter() - t0)
+        self.ultimo_uso = time.monotonic()
+
+    def vivo(self):                               # Chequeo de salud barato: el proceso no ha terminado
+        return self.proc.poll() is None
+
+    def consultar(self, nombre):
+        """
+        Envía un nombre de objeto (sha, HEAD, refs/heads/x...) y devuelve
+        (sha, tipo, tamaño, contenido) o None si el objeto no existe.
+        contenido solo se lee en modo --batch.
+        """
+        if "\n" in nombre:
+            raise ValueError("El nombre del objeto no puede contener saltos de línea")
+        try:
+            self.proc.stdin.write(nombre.encode("utf-8") + b"\n")
+            self.proc.stdin.flush()
+            cabecera = self.proc.stdout.readline()
+        except (BrokenPipeError, OSError) as e:
+            raise GitPoolError(str(e)) from e
+        if not cabecera:
+            raise GitPoolError("git cat-file terminó inesperadamente")
+        self.ultimo_uso = time.monotonic()
+
+        partes = cabecera.decode("utf-8", errors="replace").split()
+        if len(partes) == 2 and partes[1] in ("missing", "ambiguous"):
+            return None
+        if len(partes) != 3:
+            raise GitPoolError(f"Respuesta inesperada de git cat-file: {cabecera!r}")
+        sha, tipo, tamano = partes[0], partes[1], int(partes[2])
+
+        contenido = None
+        if self.modo == BATCH:
+            contenido = self.proc.stdout.read(tamano)
+            self.proc.stdout.read(1)              # Salto de línea que sigue al contenido
+        return sha, tipo, tamano, contenido
+
+    def cerrar(self):
+        try:
+            self.proc.stdin.close()
+        except OSError:
+            pass
+        try:
+            self.proc.wait(timeout=2)
+        except subprocess.TimeoutExpired:
+            self.proc.kill()
+            self.proc.wait()
+
+
+class GitProcessPool:
+    """
+    Hasta GIT_POOL_SIZE procesos por (repo, modo). Los procesos muertos se
+    descartan al devolverlos y los ociosos más de GIT_POOL_IDLE_SECONDS se cierran.
+    """
+
+    def __init__(self, tamano=GIT_POOL_SIZE, ocioso=GIT_POOL_IDLE_SECONDS):
+        self.tamano = tamano
+        self.ocioso = ocioso
+        self._libres = {}                         # (repo, modo) -> [GitBatchProcess]
+        self._en_uso = {}                         # (repo, modo) -> número de procesos prestados
+        self._cond = threading.Condition()
+
+    def _desalojar_ociosos(self):                 # Llamar con _cond adquirido
+        limite = time.monotonic() - self.ocioso
+        for clave, libres in list(self._libres.items()):
+            vivos = []
+            for p in libres:
+                if p.ultimo_uso < limite or not p.vivo():
+                    p.cerrar()
+                else:
+                    vivos.append(p)
+            if vivos:
+                self._libres[clave] = vivos
+            else:
+                del self._libres[clave]
+
+    def _adquirir(self, repo_path, modo):
+        clave = (repo_path, modo)
+        with self._cond:
+            self._desalojar_ociosos()
+            while True:
+                libres = self._libres.get(clave)
+                if libres:
+                    proceso = libres.pop()
+                    self._en_uso[clave] = self._en_uso.get(clave, 0) + 1
+                    registrar_cache("git_pool", True)
+                    return proceso
+                if self._en_uso.get(clave, 0) < self.tamano:
+                    self._en_uso[clave] = self._en_uso.get(clave, 0) + 1
+                    break
+                self._cond.wait()
+        registrar_cache("git_pool", False)
+        try:
+            return GitBatchProcess(repo_path, modo)   # Se lanza fuera del lock para no bloquear otros repos
+        except OSError:
+            with self._cond:
+                self._en_uso[clave] -= 1
+                self._cond.notify()
+            raise
+
+    def _devolver(self, proceso, sano):
+        clave = (proceso.repo_path, proceso.modo)
+        with self._cond:
+            self._en_uso[clave] -= 1
+            if sano and proceso.vivo():
+                self._libres.setdefault(clave, []).append(proceso)
+            else:
+                proceso.cerrar()
+            self._cond.notify()
+
+    def consultar(self, repo_path, nombre, modo=BATCH_CHECK):
+        """Consulta un objeto o ref; si el proceso estaba muerto se reintenta una vez con uno nuevo."""
+        t0 = time.perf_counter()
+        for intento in range(2):
+            proceso = self._adquirir(repo_path, modo)
+            try:
+                resultado = proceso.consultar(nombre)
+            except GitPoolError:
+                self._devolver(proceso, sano=False)
+                if intento:
+                    raise
+                continue
+            self._devolver(proceso, sano=True)
+            observar("git_pool", time.perf_counter() - t0)
+            return resultado
+
+    def cerrar_todos(self):
+        with self._cond:
+            for libres in self._libres.values():
+                for p in libres:
+                    p.cerrar()
+            self._libres.clear()
+
+
+pool = GitProcessPool()
+atexit.register(pool.cerrar_todos)
+
+
+def resolver_ref(repo_path, ref="HEAD"):          # SHA al que apunta ref, o None si no existe
+    resultado = pool.consultar(repo_path, ref)
+    return resultado[0] if resultado else None
@@ -0,0 +1,500 @@
+"""
+Lector de solo lectura de repos git en Python puro, sin subprocesos.
+
+Lee refs y packed-refs, índices de pack v2 y packfiles a través de mmap
+(resolviendo deltas OFS/REF), objetos sueltos y, si existe, el fichero
+commit-graph para obtener los padres sin descomprimir el commit.
+iter_commits produce los mismos commits (registros Commit) que
+`git log --pretty=format:%H|%cI|%s [rango]`.
+"""
+import os
+import mmap
+import zlib
+import heapq
+import struct
+import threading
+
+from git_utils.commit_record import Commit   # Registro compacto de commit
+
+TIPOS = {1: "commit", 2: "tree", 3: "blob", 4: "tag"}
+OFS_DELTA = 6
+REF_DELTA = 7
+SLOP = 5                                        # Igual que git: vueltas extra por desfases de reloj en rangos a..b
+
+
+class GitReaderError(Exception):
+    """El repo usa algo que este lector no soporta (SHA-256, reftable, ...) o está dañado."""
+
+
+def _git_dir(repo_path):                        # Carpeta .git (o la apuntada por un fichero .git de worktree)
+    path = os.path.join(repo_path, ".git")
+    if os.path.isfile(path):
+        with open(path, encoding="utf-8") as f:
+            contenido = f.read().strip()
+        if not contenido.startswith("gitdir:"):
+            raise GitReaderError(f"Fichero .git no reconocido en {repo_path}")
+        path = os.path.normpath(os.path.join(repo_path, contenido[len("gitdir:"):].strip()))
+    if not os.path.isdir(path):
+        raise GitReaderError(f"{repo_path} no es un repositorio git")
+    return path
+
+
+def _mmap(path):
+    with open(path, "rb") as f:
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+def _inflar(buf, pos):                          # Descomprime un stream zlib empezando en pos sin copiar el resto del fichero
+    d = zlib.decompressobj()
+    partes = []
+    paso = 4096
+    while not d.eof:
+        trozo = buf[pos:pos + paso]
+        if not trozo:
+            raise GitReaderError("Stream zlib truncado")
+        partes.append(d.decompress(trozo))
+        pos += paso
+        paso = min(paso * 4, 1 << 20)
+    return b"".join(partes)
+
+
+def _aplicar_delta(base, delta):
+    def varint(pos):
+        valor = desplazamiento = 0
+        while True:
+            c = delta[pos]
+            pos += 1
+            valor |= (c & 0x7F) << desplazamiento
+            desplazamiento += 7
+            if not c & 0x80:
+                return valor, pos
+
+    _, pos = varint(0)                          # Tamaño de la base
+    tamano, pos = varint(pos)
+    salida = bytearray()
+    while pos < len(delta):
+        cmd = delta[pos]
+        pos += 1
+        if cmd & 0x80:                          # Copiar un trozo de la base
+            offset = size = 0
+            for i in range(4):
+                if cmd & (1 << i):
+                    offset |= delta[pos] << (8 * i)
+                    pos += 1
+            for i in range(3):
+                if cmd & (0x10 << i):
+                    size |= delta[pos] << (8 * i)
+                    pos += 1
+            salida += base[offset:offset + (size or 0x10000)]
+        elif cmd:                               # Insertar datos literales
+            salida += delta[pos:pos + cmd]
+            pos += cmd
+        else:
+            raise GitReaderError("Instrucción de delta inválida")
+    if len(salida) != tamano:
+        raise GitReaderError("Delta con tamaño inesperado")
+    return bytes(salida)
+
+
+class Pack:
+    """Par .idx (v2) + .pack abiertos con mmap."""
+
+    def __init__(self, idx_path):
+        self.idx = _mmap(idx_path)
+        if self.idx[:8] != b"\377tOc\x00\x00\x00\x02":
+            raise GitReaderError(f"Índice de pack no soportado: {idx_path}")
+        self.fanout = struct.unpack_from(">256I", self.idx, 8)
+        self.n = self.fanout[255]
+        self.sha_base = 8 + 256 * 4
+        self.ofs_base = self.sha_base + self.n * 24        # tras SHAs (20) y CRCs (4)
+        self.big_base = self.ofs_base + self.n * 4
+        self.pack = _mmap(idx_path[:-4] + ".pack")
+
+    def _sha(self, i):
+        pos = self.sha_base + i * 20
+        return self.idx[pos:pos + 20]
+
+    def offset(self, sha_bin):                  # Offset del objeto en el .pack, o None si no está
+        primero = sha_bin[0]
+        lo = self.fanout[primero - 1] if primero else 0
+        hi = self.fanout[primero]
+        while lo < hi:
+            mid = (lo + hi) // 2
+            actual = self._sha(mid)
+            if actual < sha_bin:
+                lo = mid + 1
+            elif actual > sha_bin:
+                hi = mid
+            else:
+                ofs = struct.unpack_from(">I", self.idx, self.ofs_base + mid * 4)[0]
+                if ofs & 0x80000000:            # Offset de 64 bits
+                    ofs = struct.unpack_from(">Q", self.idx, self.big_base + (ofs & 0x7FFFFFFF) * 8)[0]
+                return ofs
+        return None
+
+    def leer(self, offset, repo):               # (tipo, contenido) del objeto en offset, resolviendo deltas
+        buf = self.pack
+        c = buf[offset]
+        tipo = (c >> 4) & 7
+        pos = offset + 1
+        while c & 0x80:                         # Tamaño descomprimido (no hace falta: zlib sabe dónde acaba)
+            c = buf[pos]
+            pos += 1
+
+        if tipo == OFS_DELTA:
+            c = buf[pos]
+            pos += 1
+            distancia = c & 0x7F
+            while c & 0x80:
+                c = buf[pos]
+                pos += 1
+                distancia = ((distancia + 1) << 7) | (c & 0x7F)
+            tipo_base, base = self.leer(offset - distancia, repo)
+            return tipo_base, _aplicar_delta(base, _inflar(buf, pos))
+        if tipo == REF_DELTA:
+            base_sha = buf[pos:pos + 20]
+            tipo_base, base = repo.leer_objeto(base_sha.hex())
+            return tipo_base, _aplicar_delta(base, _inflar(buf, pos + 20))
+        if tipo not in TIPOS:
+            raise GitReaderError(f"Tipo de objeto {tipo} desconocido en pack")
+        return TIPOS[tipo], _inflar(buf, pos)
+
+
+class CommitGraph:
+    """Fichero objects/info/commit-graph: padres de cada commit sin leer el objeto."""
+
+    SIN_PADRE = 0x70000000
+
+    def __init__(self, path):
+        self.buf = _mmap(path)
+        if self.buf[:4] != b"CGPH" or self.buf[4] != 1 or self.buf[5] != 1:
+            raise GitReaderError("commit-graph no soportado")
+        n_chunks = self.buf[6]
+        if self.buf[7]:
+            raise GitReaderError("commit-graph con grafos base no soportado")
+        chunks = {}
+        for i in range(n_chunks):
+            cid, ofs = struct.unpack_from(">4sQ", self.buf, 8 + i * 12)
+            chunks[cid] = ofs
+        self.fanout = struct.unpack_from(">256I", self.buf, chunks[b"OIDF"])
+        self.oidl = chunks[b"OIDL"]
+        self.cdat = chunks[b"CDAT"]
+        self.edge = chunks.get(b"EDGE")
+        self.n = self.fanout[255]
+
+    def _sha(self, i):
+        pos = self.oidl + i * 20
+        return self.buf[pos:pos + 20]
+
+    def _posicion(self, sha_bin):
+        primero = sha_bin[0]
+        lo = self.fanout[primero - 1] if primero else 0
+        hi = self.fanout[primero]
+        while lo < hi:
+            mid = (lo + hi) // 2
+            actual = self._sha(mid)
+            if actual < sha_bin:
+                lo = mid + 1
+            elif actual > sha_bin:
+                hi = mid
+            else:
+                return mid
+        return None
+
+    def padres(self, sha):                      # Lista de SHAs padre, o None si el commit no está en el grafo
+        i = self._posicion(bytes.fromhex(sha))
+        if i is None:
+            return None
+        p1, p2 = struct.unpack_from(">II", self.buf, self.cdat + i * 36 + 20)
+        padres = []
+        if p1 != self.SIN_PADRE:
+            padres.append(self._sha(p1).hex())
+        if p2 == self.SIN_PADRE:
+            return padres
+        if not p2 & 0x80000000:
+            padres.append(self._sha(p2).hex())
+            return padres
+        if self.edge is None:                   # Merge de más de dos padres sin chunk EDGE
+            return None
+        pos = self.edge + (p2 & 0x7FFFFFFF) * 4
+        while True:
+            valor = struct.unpack_from(">I", self.buf, pos)[0]
+            padres.append(self._sha(valor & 0x7FFFFFFF).hex())
+            if valor & 0x80000000:
+                return padres
+            pos += 4
+
+
+class RepoReader:
+    """Acceso de solo lectura a refs y objetos de un repo."""
+
+    def __init__(self, repo_path):
+        self.git_dir = _git_dir(repo_path)
+        config = os.path.join(self.git_dir, "config")
+        if os.path.exists(config):
+            with open(config, encoding="utf-8", errors="ignore") as f:
+                texto = f.read().lower()
+            if "objectformat = sha256" in texto or "refstorage" in texto:
+                raise GitReaderError("Formato de repo no soportado por el lector en Python")
+        self.objects_dirs = [os.path.join(self.git_dir, "objects")] + self._alternates()
+        self.shallow = set()                    # En clones superficiales estos commits se tratan como raíz
+        shallow_path = os.path.join(self.git_dir, "shallow")
+        if os.path.exists(shallow_path):
+            with open(shallow_path, encoding="utf-8") as f:
+                self.shallow = {linea.strip() for linea in f if linea.strip()}
+        self.packs = []
+        self._packs_vistos = set()
+        self._cargar_packs()
+        self.graph = None
+        graph_path = os.path.join(self.git_dir, "objects", "info", "commit-graph")
+        if os.path.exists(graph_path):
+            try:
+                self.graph = CommitGraph(graph_path)
+            except (GitReaderError, KeyError, ValueError):
+                self.graph = None               # Sin grafo se leen los padres del propio commit
+
+    def _alternates(self):
+        path = os.path.join(self.git_dir, "objects", "info", "alternates")
+        if not os.path.exists(path):
+            return []
+        with open(path, encoding="utf-8") as f:
+            return [
+                os.path.normpath(os.path.join(self.git_dir, "objects", linea.strip()))
+                for linea in f if linea.strip() and not linea.startswith("#")
+            ]
+
+    def vigente(self):                          # False si un gc borró algún pack mapeado: hay que reabrir
+        return all(os.path.exists(path) for path in self._packs_vistos)
+
+    def cerrar(self):
+        for pack in self.packs:
+            pack.idx.close()
+            pack.pack.close()
+        if self.graph is not None:
+            self.graph.buf.close()
+
+    def _cargar_packs(self):                    # Abre los packs nuevos (p. ej. tras un gc)
+        nuevos = False
+        for objects in self.objects_dirs:
+            pack_dir = os.path.join(objects, "pack")
+            if not os.path.isdir(pack_dir):
+                continue
+            for nombre in sorted(os.listdir(pack_dir)):
+                path = os.path.join(pack_dir, nombre)
+                if nombre.endswith(".idx") and path not in self._packs_vistos and os.path.exists(path[:-4] + ".pack"):
+                    self.packs.append(Pack(path))
+                    self._packs_vistos.add(path)
+                    nuevos = True
+        return nuevos
+
+    # -----------------------------
+    #           REFS
+    # -----------------------------
+    def _packed_refs(self):
+        refs = {}
+        path = os.path.join(self.git_dir, "packed-refs")
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                for linea in f:
+                    if linea.startswith(("#", "^")):
+                        continue
+                    partes = linea.split()
+                    if len(partes) == 2:
+                        refs[partes[1]] = partes[0]
+        return refs
+
+    def resolver_ref(self, nombre="HEAD"):      # SHA al que apunta una ref (siguiendo refs simbólicas), o None
+        for _ in range(10):
+            path = os.path.join(self.git_dir, *nombre.split("/"))
+            if os.path.isfile(path):
+                with open(path, encoding="utf-8") as f:
+                    valor = f.read().strip()
+                if valor.startswith("ref:"):
+                    nombre = valor[4:].strip()
+                    continue
+                return valor or None
+            return self._packed_refs().get(nombre)
+        raise GitReaderError("Cadena de refs simbólicas demasiado larga")
+
+    # -----------------------------
+    #          OBJETOS
+    # -----------------------------
+    def leer_objeto(self, sha):                 # (tipo, contenido) de un objeto
+        sha_bin = bytes.fromhex(sha)
+        for intento in range(2):
+            for pack in self.packs:
+                offset = pack.offset(sha_bin)
+                if offset is not None:
+                    return pack.leer(offset, self)
+            for objects in self.objects_dirs:
+                path = os.path.join(objects, sha[:2], sha[2:])
+                if os.path.exists(path):
+                    with open(path, "rb") as f:
+                        datos = zlib.decompress(f.read())
+                    cabecera, _, contenido = datos.partition(b"\0")
+                    return cabecera.split(b" ", 1)[0].decode("ascii"), contenido
+            if intento or not self._cargar_packs():
+                break                           # Igual que git: si falta un objeto se buscan packs nuevos una vez
+        raise GitReaderError(f"Objeto {sha} no encontrado")
+
+    def leer_commit(self, sha):
+        """(padres, epoch del committer, offset '+HHMM', subject) de un commit."""
+        tipo, datos = self.leer_objeto(sha)
+        if tipo != "commit":
+            raise GitReaderError(f"{sha} no es un commit")
+        cabecera, _, mensaje = datos.partition(b"\n\n")
+        padres = []
+        epoch, tz = 0, "+0000"
+        for linea in cabecera.split(b"\n"):
+            if linea.startswith(b"parent "):
+                padres.append(linea[7:47].decode("ascii"))
+            elif linea.startswith(b"committer "):
+                partes = linea.rsplit(b" ", 2)
+                epoch, tz = int(partes[1]), partes[2].decode("ascii")
+        return padres, epoch, tz, _subject(mensaje)
+
+    # -----------------------------
+    #        RECORRIDO
+    # -----------------------------
+    def iter_commits(self, rev_range=None):
+        """
+        Commits en el orden de `git log` (fecha de committer descendente,
+        empate por orden de llegada). rev_range admite "<rev>" o "<a>..<b>".
+        """
+        if rev_range and ".." in rev_range:
+            excluir, incluir = rev_range.split("..", 1)
+        else:
+            excluir, incluir = None, rev_range or "HEAD"
+
+        info = {}                               # sha -> (padres, epoch, tz, subject)
+        no_interesantes = set()
+        vistos = set()
+        cola = []
+        contador = 0
+
+        def commit(sha):
+            if sha not in info:
+                info[sha] = self.leer_commit(sha)
+            return info[sha]
+
+        def encolar(sha):
+            nonlocal contador
+            if sha in vistos:
+                return
+            vistos.add(sha)
+            heapq.heappush(cola, (-commit(sha)[1], contador, sha))
+            contador += 1
+
+        def marcar_no_interesante(sha):         # Propaga a los ancestros ya vistos, como mark_parents_uninteresting
+            pila = [sha]
+            while pila:
+                actual = pila.pop()
+                if actual in no_interesantes:
+                    continue
+                no_interesantes.add(actual)
+                if actual in info:
+                    pila.extend(p for p in info[actual][0] if p in vistos)
+
+        def padres(sha):
+            if sha in self.shallow:
+                return []
+            if self.graph is not None:
+                desde_grafo = self.graph.padres(sha)
+                if desde_grafo is not None:
+                    return desde_grafo
+            return commit(sha)[0]
+
+        inicio = self._resolver(incluir)
+        if inicio is None:
+            return
+        encolar(inicio)
+        if excluir is not None:
+            base = self._resolver(excluir or "HEAD")
+            if base is not None:
+                encolar(base)
+                marcar_no_interesante(base)
+
+        if excluir is None:                     # Recorrido simple: se emite en cuanto sale de la cola
+            while cola:
+                _, _, sha = heapq.heappop(cola)
+                yield _registro(sha, commit(sha))
+                for p in padres(sha):
+                    encolar(p)
+            return
+
+        salida = []                             # Recorrido limitado (a..b), como limit_list de git
+        holgura = SLOP
+        while cola:
+            _, _, sha = heapq.heappop(cola)
+            for p in padres(sha):
+                encolar(p)
+                if sha in no_interesantes:
+                    marcar_no_interesante(p)
+            if sha in no_interesantes:
+                if all(s in no_interesantes for _, _, s in cola):
+                    holgura -= 1
+                    if holgura <= 0:
+                        break
+                else:
+                    holgura = SLOP
+                continue
+            salida.append(sha)
+        for sha in salida:
+            if sha not in no_interesantes:
+                yield _registro(sha, commit(sha))
+
+    def _resolver(self, rev):                   # Acepta un SHA completo o un nombre de ref
+        if len(rev) == 40 and all(c in "0123456789abcdef" for c in rev):
+            return rev
+        for nombre in (rev, f"refs/heads/{rev}", f"refs/tags/{rev}", f"refs/remotes/{rev}"):
+            sha = self.resolver_ref(nombre)
+            if sha:
+                return sha
+        raise GitReaderError(f"Revisión {rev} no soportada por el lector en Python")
+
+
+def _subject(mensaje):                          # Igual que %s: primer párrafo unido con espacios
+    lineas = mensaje.split(b"\n")
+    i = 0
+    while i < len(lineas) and not lineas[i].strip():
+        i += 1                                  # git salta las líneas en blanco iniciales
+    partes = []
+    while i < len(lineas):
+        linea = lineas[i].rstrip()
+        if not linea:
+            break
+        partes.append(linea)
+        i += 1
+    return b" ".join(partes).decode("utf-8", errors="ignore")
+
+
+def _registro(sha, datos):                      # Commit compacto: epoch y offset en minutos tal cual vienen del objeto
+    _, epoch, tz, subject = datos
+    signo = -1 if tz[0] == "-" else 1
+    return Commit(sha, epoch, signo * (int(tz[1:3]) * 60 + int(tz[3:5])), subject)
+
+
+_lectores = {}                                  # repo_path -> RepoReader (los packs quedan mapeados entre llamadas)
+_lock = threading.Lock()
+
+
+def obtener_lector(repo_path):
+    with _lock:
+        lector = _lectores.get(repo_path)
+        if lector is not None and not lector.vigente():
+            lector.cerrar()                     # Libera los mmaps (en Windows impiden que gc borre los packs)
+            lector = None
+        if lector is None:
+            lector = _lectores[repo_path] = RepoReader(repo_path)
+        return lector
+
+
+_ERRORES_LECTURA = (OSError, ValueError, IndexError, KeyError, struct.error, zlib.error)   # mmap vacío, pack truncado...
+
+
+def iter_commits(repo_path, rev_range=None):    # Atajo usado por git_operations cuando GIT_BACKEND = "python"
+    """Como RepoReader.iter_commits, pero cualquier fallo de lectura sale como GitReaderError."""
+    try:
+        yield from obtener_lector(repo_path).iter_commits(rev_range)
+    except _ERRORES_LECTURA as e:
+        raise GitReaderError(f"No se pudo leer {repo_path}: {e}") from e
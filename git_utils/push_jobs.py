@@ -0,0 +1,343 @@
+import os                                        # push_log.txt de cada repo y lock de push dentro de .git
+import json                                      # Cada trabajo se guarda como JSON en la base compartida
+import time                                      # Antigüedad del lock de push de otro proceso
+import uuid                                      # Identificadores de trabajo
+import logging                                   # Fallos en los hilos del executor (nadie lee sus futures)
+import sqlite3                                   # Estado de los trabajos visible para todos los procesos
+import threading                                 # Lock del estado compartido y reintentos con Timer
+from collections import deque                    # Cola FIFO de pushes por repo
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from git_utils.git_operations import git_push_and_log
+from helpers.fragment_cache import invalidar_repo
+from config.settings import (
+    PUSH_WORKERS,
+    PUSH_JOBS_MAX,
+    PUSH_LOTES_MAX,
+    PUSH_LOCK_FILE,
+    PUSH_LOCK_RETRY,
+    PUSH_LOCK_STALE,
+    PUSH_TIMEOUT,
+    PUSH_JOBS_DB,
+    SHARED_CACHE_DIR
+)
+
+PENDIENTE = "pendiente"
+EN_CURSO = "en_curso"
+COMPLETADO = "completado"
+ERROR = "error"
+
+OK = "ok"                                        # Resultado de cada repo en el informe de un push masivo
+SIN_CAMBIOS = "sin_cambios"
+FALLIDO = "fallido"
+
+_executor = ThreadPoolExecutor(max_workers=PUSH_WORKERS, thread_name_prefix="push")
+_colas = {}                                      # repo_path -> deque de pushes esperando al que está en marcha
+_lock = threading.Lock()
+_local = threading.local()                       # Una conexión SQLite por hilo
+_log = logging.getLogger("methub.push")
+
+
+# -----------------------------
+#   ESTADO COMPARTIDO (SQLite)
+# -----------------------------
+# El push corre en el proceso que lo recibió, pero con varios workers de
+# gunicorn la consulta de estado puede llegar a otro: el estado vive en una
+# base SQLite dentro de SHARED_CACHE_DIR que todos leen. Solo el proceso
+# dueño de un trabajo (o de un lote de push masivo) lo modifica.
+def _conexion():
+    con = getattr(_local, "con", None)
+    if con is None:
+        try:
+            os.makedirs(SHARED_CACHE_DIR, exist_ok=True)
+            con = sqlite3.connect(os.path.join(SHARED_CACHE_DIR, PUSH_JOBS_DB), timeout=30, isolation_level=None)
+            con.execute("PRAGMA journal_mode=WAL")     # Lectores de otros procesos no bloquean al que escribe
+        except (OSError, sqlite3.Error):
+            # Carpeta no escribible: base en memoria, compartida solo entre los hilos de este proceso
+            con = sqlite3.connect("file:methub_push_jobs?mode=memory&cache=shared", uri=True,
+                                  timeout=30, isolation_level=None)
+        for tabla in ("jobs", "lotes"):
+            con.execute(f"CREATE TABLE IF NOT EXISTS {tabla} (id TEXT PRIMARY KEY, estado TEXT, creado TEXT, datos TEXT)")
+        _local.con = con
+    return con
+
+
+def _guardar(con, registro, tabla="jobs"):
+    con.execute(
+        f"INSERT OR REPLACE INTO {tabla} VALUES (?, ?, ?, ?)",
+        (registro["id"], registro["estado"], registro["creado"], json.dumps(registro, ensure_ascii=False))
+    )
+
+
+def _leer(con, registro_id, tabla="jobs"):
+    fila = con.execute(f"SELECT datos FROM {tabla} WHERE id = ?", (registro_id,)).fetchone()
+    return json.loads(fila[0]) if fila else None
+
+
+def _actualizar(job_id, **campos):              # Devuelve una copia del trabajo ya actualizado
+    with _lock:
+        con = _conexion()
+        con.execute("BEGIN IMMEDIATE")
+        with con:                                # Se confirma al salir o se deshace si falla
+            job = _leer(con, job_id) or {"id": job_id, "creado": datetime.now().isoformat()}
+            job.update(campos)
+            _guardar(con, job)
+        return job
+
+
+def _marcar_error(registro_id, error, tabla="jobs"):
+    """
+    Último recurso cuando falla la actualización normal: deja el trabajo (o
+    lote) en ERROR para que quien lo consulta deje de esperar. Devuelve el
+    registro, o None si no existe, ya estaba cerrado o tampoco se pudo
+    escribir (ya queda en el log).
+    """
+    try:
+        with _lock:
+            con = _conexion()
+            con.execute("BEGIN IMMEDIATE")
+            with con:
+                registro = _leer(con, registro_id, tabla)
+                if registro is None or terminado(registro):
+                    return None                  # Podado, inexistente o ya cerrado: no hay nada que cerrar
+                registro.update(estado=ERROR, error=str(error), fin=datetime.now().isoformat())
+                _guardar(con, registro, tabla)
+            return registro
+    except Exception:
+        _log.exception("No se pudo marcar %s %s como fallido", tabla, registro_id)
+        return None
+
+
+def _podar(con, tabla, maximo):                  # Descarta los trabajos (o lotes) terminados más antiguos
+    total = con.execute(f"SELECT COUNT(*) FROM {tabla}").fetchone()[0]
+    con.execute(
+        f"DELETE FROM {tabla} WHERE id IN (SELECT id FROM {tabla} WHERE estado IN (?, ?) ORDER BY creado LIMIT ?)",
+        (COMPLETADO, ERROR, max(0, total - maximo))
+    )
+
+
+# -----------------------------
+#     UN PUSH POR REPO A LA VEZ
+# -----------------------------
+# Dentro del proceso, cada repo tiene una cola FIFO y solo su primer push está
+# en el executor: los siguientes se envían cuando este termina, así que ningún
+# hilo del executor se queda esperando a otro push del mismo repo. Entre
+# procesos (Tkinter, Flask, workers de gunicorn) lo garantiza un lock en .git.
+def _encolar(tarea):
+    repo_path = tarea[1]
+    with _lock:
+        if repo_path in _colas:
+            _colas[repo_path].append(tarea)      # Ya hay un push de este repo en marcha
+            return
+        _colas[repo_path] = deque()
+    _executor.submit(_ejecutar, *tarea)
+
+
+def _siguiente(repo_path):                       # Envía al executor el siguiente push del repo, si hay
+    with _lock:
+        cola = _colas[repo_path]
+        if not cola:
+            del _colas[repo_path]
+            return
+        tarea = cola.popleft()
+    _executor.submit(_ejecutar, *tarea)
+
+
+def _bloquear_repo(repo_path):
+    """
+    Lock de push entre procesos (O_EXCL en .git, como la caché compartida).
+    Devuelve (ruta, fd), None si otro proceso está haciendo push o
+    ("", None) si no se puede crear (worktree, sin permisos): se sigue sin él.
+    """
+    lock = os.path.join(repo_path, ".git", PUSH_LOCK_FILE)
+    try:
+        return lock, os.open(lock, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+    except FileExistsError:
+        try:
+            abandonado = time.time() - os.path.getmtime(lock) > PUSH_LOCK_STALE
+        except OSError:
+            return None                          # Se acaba de liberar: se reintenta enseguida
+        if abandonado:
+            try:
+                os.remove(lock)                  # El proceso que lo tenía murió a mitad de push
+            except OSError:
+                pass
+        return None
+    except OSError:
+        return "", None
+
+
+def _renovar_lock(lock, parar):                  # Hilo del dueño: renueva el mtime para que nadie lo tome por abandonado
+    while not parar.wait(PUSH_LOCK_STALE / 3):
+        try:
+            os.utime(lock)
+        except OSError:
+            return
+
+
+def _desbloquear_repo(bloqueo, parar):
+    lock, fd = bloqueo
+    parar.set()
+    if fd is None:
+        return
+    os.close(fd)
+    try:
+        os.remove(lock)
+    except OSError:
+        pass
+
+
+def _ejecutar(job_id, repo_path, branch, log_file, on_done, timeout):
+    bloqueo = _bloquear_repo(repo_path)
+    if bloqueo is None:                          # Otro proceso está en ello: reintentar sin ocupar un hilo
+        reintento = threading.Timer(
+            PUSH_LOCK_RETRY,
+            _executor.submit,
+            (_ejecutar, job_id, repo_path, branch, log_file, on_done, timeout)
+        )
+        reintento.daemon = True
+        reintento.start()
+        return
+    parar = threading.Event()
+    if bloqueo[1] is not None:
+        threading.Thread(target=_renovar_lock, args=(bloqueo[0], parar), daemon=True).start()
+    try:
+        try:
+            _actualizar(job_id, estado=EN_CURSO, inicio=datetime.now().isoformat())
+            resultado = git_push_and_log(repo_path, branch, log_file, timeout)
+        except Exception as e:
+            job = _actualizar(job_id, estado=ERROR, error=str(e), fin=datetime.now().isoformat())
+        else:
+            job = _actualizar(job_id, estado=COMPLETADO, resultado=resultado, fin=datetime.now().isoformat())
+    except Exception as e:                       # La base compartida falló (p. ej. "database is locked")
+        _log.exception("No se pudo guardar el estado del push %s", job_id)
+        job = _marcar_error(job_id, e) or {"id": job_id, "estado": ERROR, "resultado": None, "error": str(e)}
+    finally:
+        _desbloquear_repo(bloqueo, parar)
+        invalidar_repo(repo_path)                # Los fragmentos HTML de este repo ya no sirven tras el push
+        _siguiente(repo_path)
+    if on_done:
+        try:
+            on_done(job)                         # El estado final aunque el trabajo ya se haya podado
+        except Exception:
+            _log.exception("Falló el aviso de fin del push %s", job_id)
+
+
+def enviar_push(repo_path, branch, log_file, on_done=None, timeout=PUSH_TIMEOUT):
+    """
+    Encola git_push_and_log en segundo plano y devuelve el id del trabajo al instante.
+    on_done (opcional) se llama desde el hilo del executor con el estado final.
+    timeout limita los segundos del git push (por defecto PUSH_TIMEOUT): un push
+    colgado en una petición de credenciales acaba en error y libera su hilo.
+    """
+    job_id = uuid.uuid4().hex
+    with _lock:
+        con = _conexion()
+        _guardar(con, {
+            "id": job_id,
+            "repo": repo_path,
+            "branch": branch,
+            "estado": PENDIENTE,
+            "resultado": None,
+            "error": None,
+            "creado": datetime.now().isoformat(),
+        })
+        _podar(con, "jobs", PUSH_JOBS_MAX)
+    _encolar((job_id, repo_path, branch, log_file, on_done, timeout))
+    return job_id
+
+
+def estado_push(job_id):                         # Estado del trabajo, lo lanzara este proceso u otro (None si no existe)
+    return _leer(_conexion(), job_id)
+
+
+def terminado(job):
+    return job is not None and job["estado"] in (COMPLETADO, ERROR)
+
+
+# -----------------------------
+#        PUSH MASIVO
+# -----------------------------
+def resultado_push(job):                         # OK / SIN_CAMBIOS / FALLIDO de un trabajo terminado
+    if job["estado"] == ERROR:
+        return FALLIDO
+    return OK if job["resultado"] else SIN_CAMBIOS
+
+
+def _anotar(lote_id, repo_id, job, on_done):     # Se llama al terminar cada push del lote (hilo del executor)
+    try:
+        lote = _anotar_en_lote(lote_id, repo_id, job)
+    except Exception as e:                       # Sin anotar, pendientes no llegaría nunca a 0: se cierra el lote
+        _log.exception("No se pudo anotar el push de %s en el lote %s", repo_id, lote_id)
+        lote = _marcar_error(lote_id, e, "lotes")
+    if lote is not None and on_done:
+        on_done(lote)
+
+
+def _anotar_en_lote(lote_id, repo_id, job):     # Devuelve el lote solo si esta anotación lo cierra
+    with _lock:
+        con = _conexion()
+        con.execute("BEGIN IMMEDIATE")
+        with con:
+            lote = _leer(con, lote_id, "lotes")
+            if lote is None:
+                raise KeyError(f"Lote {lote_id} no encontrado")
+            fila = lote["repos"][repo_id]
+            fila.update(
+                estado=resultado_push(job),
+                sha=job["resultado"][0] if job["resultado"] else None,
+                error=job["error"],
+                fin=job.get("fin"),
+            )
+            lote[fila["estado"]] += 1
+            lote["pendientes"] -= 1
+            cerrado = lote["pendientes"] == 0 and lote["estado"] == EN_CURSO   # Uno ya en ERROR no se reabre
+            if cerrado:
+                lote.update(estado=COMPLETADO, fin=datetime.now().isoformat())
+            _guardar(con, lote, "lotes")
+    return lote if cerrado else None
+
+
+def enviar_push_masivo(repos, branch, on_done=None, timeout=PUSH_TIMEOUT):
+    """
+    Encola un push por repo ({repo_id: ruta}, p. ej. el de obtener_repositorios)
+    y devuelve el id del lote al instante. Comparten el executor de los pushes
+    sueltos, así que nunca corren más de PUSH_WORKERS a la vez ni dos en el
+    mismo repo. on_done (opcional) recibe el informe cuando acaba el último.
+    """
+    lote_id = uuid.uuid4().hex
+    lote = {
+        "id": lote_id,
+        "branch": branch,
+        "estado": EN_CURSO if repos else COMPLETADO,
+        "creado": datetime.now().isoformat(),
+        "fin": None if repos else datetime.now().isoformat(),
+        "pendientes": len(repos),
+        OK: 0,
+        SIN_CAMBIOS: 0,
+        FALLIDO: 0,
+        "repos": {
+            repo_id: {"repo": path, "estado": PENDIENTE, "sha": None, "error": None, "fin": None}
+            for repo_id, path in repos.items()
+        },
+    }
+    with _lock:
+        con = _conexion()
+        _guardar(con, lote, "lotes")              # Antes de encolar: los pushes anotan en él al terminar
+        _podar(con, "lotes", PUSH_LOTES_MAX)
+    for repo_id, path in repos.items():
+        enviar_push(
+            path,
+            branch,
+            os.path.join(path, "push_log.txt"),
+            on_done=lambda job, repo_id=repo_id: _anotar(lote_id, repo_id, job, on_done),
+            timeout=timeout
+        )
+    if not repos and on_done:
+        on_done(lote)
+    return lote_id
+
+
+def estado_lote(lote_id):                        # Informe del lote, lo lanzara este proceso u otro (None si no existe)
+    return _leer(_conexion(), lote_id, "lotes")
@@ -0,0 +1,94 @@
+import os                                        # Para stat del log y detectar cambios
+import sys                                       # sys.intern: el índice comparte los SHA con los Commit
+import threading                                 # El estado por log se comparte entre hilos
+
+_estados = {}                                    # log_file -> estado del lector incremental
+_lock = threading.Lock()
+_escritura = threading.Lock()                    # Serializa las escrituras de los pushes de este proceso
+
+
+def _estado_nuevo(st):
+    return {
+        "ino": st.st_ino,                        # Si cambia, el log se reemplazó: se relee desde cero
+        "offset": 0,                             # Byte hasta el que ya se parseó (siempre tras un salto de línea)
+        "dates": {},                             # sha -> fecha del último push de ese commit
+        "lineas_invalidas": 0,
+    }
+
+
+def _parse_linea(linea, estado):                 # Añade una línea "<sha> <fecha>" al índice; ignora las mal formadas
+    partes = linea.decode("utf-8", errors="ignore").split()
+    if len(partes) != 2:
+        if partes:
+            estado["lineas_invalidas"] += 1
+        return
+    sha, date = partes
+    estado["dates"][sys.intern(sha)] = date
+
+
+def _actualizar(log_file):
+    """Lee solo lo añadido al log desde la última llamada y devuelve el estado (None si no existe)."""
+    try:
+        st = os.stat(log_file)
+    except OSError:
+        _estados.pop(log_file, None)
+        return None
+
+    estado = _estados.get(log_file)
+    if estado is None or estado["ino"] != st.st_ino or st.st_size < estado["offset"]:
+        estado = _estado_nuevo(st)               # Primera lectura, log reemplazado o truncado
+        _estados[log_file] = estado
+
+    if st.st_size > estado["offset"]:
+        with open(log_file, "rb") as f:
+            f.seek(estado["offset"])
+            nuevo = f.read(st.st_size - estado["offset"])
+        fin = nuevo.rfind(b"\n") + 1             # Una línea a medio escribir se deja para la próxima lectura
+        for linea in nuevo[:fin].splitlines():
+            _parse_linea(linea, estado)
+        estado["offset"] += fin
+    return estado
+
+
+def leer_push_log(log_file):                     # Diccionario sha -> fecha de push (copia), leyendo solo lo nuevo
+    with _lock:
+        estado = _actualizar(log_file)
+        return dict(estado["dates"]) if estado else {}
+
+
+def contar_pushes(log_file):                     # Número de commits distintos con push, sin copiar el índice
+    with _lock:
+        estado = _actualizar(log_file)
+        return len(estado["dates"]) if estado else 0
+
+
+def version_push_log(log_file):                  # Versión barata del log (tamaño-mtime), sin leerlo; "-" si no existe
+    try:
+        st = os.stat(log_file)
+    except OSError:
+        return "-"
+    return f"{st.st_size}-{st.st_mtime_ns}"
+
+
+def registrar_push(log_file, sha, fecha):
+    """
+    Añade "<sha> <fecha>" al log con una sola escritura O_APPEND: dos procesos
+    (Flask y Tkinter, o varios workers) que registran a la vez nunca mezclan
+    líneas. Si la última línea quedó cortada por un cierre inesperado se
+    termina antes para no pegarle la nueva.
+    """
+    linea = f"{sha} {fecha}\n".encode("utf-8")
+    with _escritura:
+        fd = os.open(log_file, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            if os.fstat(fd).st_size and not _termina_en_salto(log_file):
+                linea = b"\n" + linea
+            os.write(fd, linea)
+        finally:
+            os.close(fd)
+
+
+def _termina_en_salto(log_file):
+    with open(log_file, "rb") as f:
+        f.seek(-1, os.SEEK_END)
+        return f.read(1) == b"\n"
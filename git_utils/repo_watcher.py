@@ -0,0 +1,107 @@
+import os                                         # stat de HEAD, refs y push_log.txt
+import queue                                      # Cada suscriptor recibe los avisos por su cola
+import threading                                  # Un solo hilo vigila todos los repos abiertos
+import time
+
+from config.settings import WATCH_INTERVAL
+
+
+def _stat(path):                                  # (inodo, tamaño, mtime) o None si no existe
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_ino, st.st_size, st.st_mtime_ns
+
+
+def firma_refs(repo_path):
+    """
+    Firma barata de a dónde apunta HEAD: stat de .git/HEAD, del fichero de la
+    rama actual y de packed-refs. No lanza git ni lee objetos.
+    """
+    git_dir = os.path.join(repo_path, ".git")
+    head_path = os.path.join(git_dir, "HEAD")
+    try:
+        with open(head_path, "r", encoding="utf-8") as f:
+            head = f.read().strip()
+    except OSError:
+        return None
+    rama = head[5:].strip() if head.startswith("ref:") else None
+    return (
+        head,
+        _stat(head_path),
+        _stat(os.path.join(git_dir, rama)) if rama else None,
+        _stat(os.path.join(git_dir, "packed-refs")),
+    )
+
+
+def firma_push_log(repo_path):
+    return _stat(os.path.join(repo_path, "push_log.txt"))
+
+
+class RepoWatcher:
+    """
+    Sondea cada WATCH_INTERVAL segundos solo los repos que alguien está viendo
+    y avisa a sus suscriptores con {"repo", "refs", "push_log"} (qué cambió).
+    """
+
+    def __init__(self, intervalo=WATCH_INTERVAL):
+        self.intervalo = intervalo
+        self._suscriptores = {}                   # repo_path -> [Queue]
+        self._firmas = {}                         # repo_path -> (firma_refs, firma_push_log)
+        self._lock = threading.Lock()
+        self._hilo = None
+
+    def suscribir(self, repo_path):
+        cola = queue.Queue(maxsize=16)
+        with self._lock:
+            if repo_path not in self._suscriptores:
+                self._firmas[repo_path] = (firma_refs(repo_path), firma_push_log(repo_path))
+            self._suscriptores.setdefault(repo_path, []).append(cola)
+            if self._hilo is None:
+                self._hilo = threading.Thread(target=self._bucle, name="repo-watcher", daemon=True)
+                self._hilo.start()
+        return cola
+
+    def cancelar(self, repo_path, cola):
+        with self._lock:
+            colas = self._suscriptores.get(repo_path, [])
+            if cola in colas:
+                colas.remove(cola)
+            if not colas:
+                self._suscriptores.pop(repo_path, None)
+                self._firmas.pop(repo_path, None)
+
+    def comprobar(self):                          # Una vuelta de sondeo (la llama el hilo)
+        with self._lock:
+            repos = list(self._suscriptores)
+        for repo_path in repos:
+            firma = (firma_refs(repo_path), firma_push_log(repo_path))
+            with self._lock:
+                anterior = self._firmas.get(repo_path)
+                if anterior is None or anterior == firma:
+                    continue                      # Sin cambios o nadie lo vigila ya
+                self._firmas[repo_path] = firma
+                colas = list(self._suscriptores.get(repo_path, []))
+            aviso = {"repo": repo_path, "refs": anterior[0] != firma[0], "push_log": anterior[1] != firma[1]}
+            for cola in colas:
+                try:
+                    cola.put_nowait(aviso)
+                except queue.Full:
+                    pass                          # El suscriptor va atrasado: ya tiene avisos pendientes de este repo
+
+    def _bucle(self):
+        while True:
+            time.sleep(self.intervalo)
+            self.comprobar()
+
+
+vigilante = RepoWatcher()
+
+
+def suscribir(repo_path):                         # Cola por la que llegarán los avisos de cambios del repo
+    return vigilante.suscribir(repo_path)
+
+
+def cancelar(repo_path, cola):
+    vigilante.cancelar(repo_path, cola)
@@ -0,0 +1,44 @@
+import os                                          # Ficheros de caché dentro de .git
+import threading                                   # Flask y los hilos de Tkinter comparten las cachés
+
+
+class CachePorRepo:
+    """
+    Estado común de las cachés por repo (commits, resumen de tareas, store
+    columnar): el memo ya cargado en este proceso y un lock por repo, para
+    que cada repo se actualice por separado y en paralelo.
+    """
+
+    def __init__(self):
+        self.memoria = {}                          # repo_path -> valor ya cargado en este proceso
+        self._locks = {}                           # repo_path -> Lock
+        self._lock = threading.Lock()
+
+    def lock(self, repo_path):
+        with self._lock:
+            return self._locks.setdefault(repo_path, threading.Lock())
+
+    def invalidar(self, repo_path, *paths):        # Fuerza una reconstrucción completa en la próxima lectura
+        with self.lock(repo_path):
+            self.memoria.pop(repo_path, None)
+            for path in paths:                     # Ficheros en disco de esta caché
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+
+
+def escribir_atomico(path, escribir):
+    """
+    Escribe path de forma atómica (tmp + replace); escribir(f) recibe el
+    temporal abierto en texto. Sin permisos de escritura devuelve False sin
+    lanzar: la copia en memoria sigue valiendo.
+    """
+    tmp_path = f"{path}.tmp"
+    try:
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            escribir(f)
+        os.replace(tmp_path, path)
+        return True
+    except OSError:
+        return False
@@ -0,0 +1,411 @@
+import os                                          # Ficheros de la caché compartida entre procesos
+import time                                        # Espera mientras otro proceso construye el store
+import shutil                                      # Borrar versiones antiguas de la caché compartida
+import hashlib                                     # Nombre de carpeta estable por repo
+import threading                                   # Nombre único del temporal por hilo
+from datetime import (                             # Para devolver filas con el mismo formato que calcular_timeline
+    date,
+    datetime,
+    timedelta
+)
+
+try:
+    import numpy as np
+except ImportError:                                # NumPy es opcional: sin él se usa calcular_timeline
+    np = None
+
+from git_utils.git_operations import get_head_sha
+from git_utils.commit_record import Commit, FilaTimeline, zona
+from git_utils.commit_cache import get_cached_commits
+from helpers.metrics import registrar_cache
+from helpers.cache_utils import CachePorRepo
+from config.settings import SHARED_CACHE_ENABLED, SHARED_CACHE_DIR, SHARED_CACHE_LOCK_TIMEOUT
+
+NUMPY_DISPONIBLE = np is not None
+
+# Códigos de marca por commit (columna kind)
+MARK_NONE = 0                                      # Commit normal
+MARK_START = 1                                     # +tarea
+MARK_STOP = 2                                      # -tarea
+MARK_MASK = 3
+FLAG_END = 4                                       # El mensaje contiene [END]
+
+HISTOGRAMA_HORAS = (0, 0.5, 1, 2, 4, 8, 24)        # Límites (en horas) del histograma de duración de tareas
+NIVELES = ("dia", "semana", "mes")                 # Periodos de los rollups
+
+_cache = CachePorRepo()                            # memoria: repo_path -> (head, CommitStore)
+
+
+def _marca(msg):                                   # Calcula el código de marca de un mensaje
+    msg = msg.strip()
+    kind = MARK_NONE
+    if msg.startswith("+"):
+        kind = MARK_START
+    elif msg.startswith("-"):
+        kind = MARK_STOP
+    if "[END]" in msg:
+        kind |= FLAG_END
+    return kind
+
+
+class CommitStore:
+    """
+    Historia de un repo en columnas, ordenada del commit más antiguo al más nuevo:
+        sha:      bytes S40
+        ts:       epoch UTC (int64)
+        tz:       offset de la zona horaria del commit en segundos (int32)
+        kind:     código de marca (MARK_* | FLAG_END)
+        messages: mensajes (lista, o _Mensajes sobre mmap; solo se usan al formatear filas)
+    Las estadísticas se calculan con operaciones vectorizadas de NumPy.
+    """
+
+    def __init__(self, sha, ts, tz, kind, messages):
+        self.sha = sha
+        self.ts = ts
+        self.tz = tz
+        self.kind = kind
+        self.messages = messages
+        self._tareas = None
+        self._acumulado = None                     # Segundos de tarea acumulados por fila (para rangos en O(log n))
+        self._periodos = {}                        # nivel -> rollup precalculado
+
+    @classmethod
+    def from_commits(cls, commits):                # commits en el orden de git log (del más nuevo al más antiguo)
+        commits = commits[::-1]
+        n = len(commits)
+        if n == 0:
+            return cls(
+                np.empty(0, dtype="S40"), np.empty(0, dtype=np.int64),
+                np.empty(0, dtype=np.int32), np.empty(0, dtype=np.int8), []
+            )
+
+        sha = np.array([c.sha for c in commits], dtype="S40")
+        ts = np.fromiter((c.ts for c in commits), dtype=np.int64, count=n)     # Los Commit ya traen epoch y zona:
+        tz = np.fromiter((c.tz for c in commits), dtype=np.int32, count=n) * 60   # no hay fechas que parsear
+        messages = [c.message for c in commits]
+        kind = np.fromiter((_marca(m) for m in messages), dtype=np.int8, count=n)
+
+        # git log ya viene casi ordenado; el orden estable respeta el de calcular_timeline
+        orden = np.argsort(ts, kind="stable")
+        if not np.array_equal(orden, np.arange(n)):
+            sha, ts, tz, kind = sha[orden], ts[orden], tz[orden], kind[orden]
+            messages = [messages[i] for i in orden]
+
+        return cls(sha, ts, tz, kind, messages)
+
+    def __len__(self):
+        return len(self.ts)
+
+    def __getitem__(self, item):                   # Permite paginar el store como la lista de filas del timeline
+        if isinstance(item, slice):
+            return [self.fila(i) for i in range(*item.indices(len(self)))]
+        return self.fila(item)
+
+    # -----------------------------
+    #         TAREAS
+    # -----------------------------
+    def tareas(self):
+        """
+        Empareja + y - sin bucles: un - cierra tarea solo si el marcador
+        anterior (+ o -) es un +, igual que el recorrido de calcular_timeline.
+        Retorna (indices_inicio, indices_fin, duraciones_en_segundos).
+        """
+        if self._tareas is None:
+            marcas = self.kind & MARK_MASK
+            idx = np.flatnonzero(marcas)
+            previos, actuales = idx[:-1], idx[1:]
+            par = (marcas[previos] == MARK_START) & (marcas[actuales] == MARK_STOP)
+            inicio, fin = previos[par], actuales[par]
+            duracion = np.maximum(self.ts[fin] - self.ts[inicio], 0)
+            self._tareas = (inicio, fin, duracion)
+        return self._tareas
+
+    def commit(self, i):                           # Commit compacto de la fila i
+        return Commit(self.sha[i].decode("ascii"), int(self.ts[i]), int(self.tz[i]) // 60, self.messages[i])
+
+    def _dt(self, i):                              # datetime con la zona horaria original del commit
+        return datetime.fromtimestamp(int(self.ts[i]), zona(int(self.tz[i]) // 60))
+
+    def fila(self, i):                             # Misma forma que las filas de calcular_timeline
+        _, fin, duracion = self.tareas()
+        pos = np.searchsorted(fin, i)
+        cierra = pos < len(fin) and fin[pos] == i
+        return FilaTimeline(self.commit(i), timedelta(seconds=int(duracion[pos])) if cierra else None)
+
+    # -----------------------------
+    #       ESTADÍSTICAS
+    # -----------------------------
+    def resumen(self):
+        """Mismas claves de resumen que calcular_timeline: inicio, commit_end, total y tareas."""
+        _, fin, duracion = self.tareas()
+        ends = np.flatnonzero(self.kind & FLAG_END)
+        return {
+            "inicio": self._dt(0) if len(self) else None,
+            "commit_end": self.fila(int(ends[0])) if len(ends) else None,
+            "total": timedelta(seconds=int(duracion.sum())),
+            "tareas": len(fin),
+        }
+
+    def _dias_locales(self):                       # Día (desde epoch) en la hora local de cada commit
+        return (self.ts + self.tz) // 86400
+
+    def commits_por_dia(self):
+        dias, cuentas = np.unique(self._dias_locales(), return_counts=True)
+        return [(_fecha(d), int(c)) for d, c in zip(dias, cuentas)]
+
+    def commits_por_semana(self):                  # Semanas que empiezan en lunes (1970-01-01 fue jueves)
+        semanas, cuentas = np.unique((self._dias_locales() + 3) // 7, return_counts=True)
+        return [(_fecha(s * 7 - 3), int(c)) for s, c in zip(semanas, cuentas)]
+
+    def tiempo_por_dia(self):                      # Segundos trabajados por día (según el commit que cierra la tarea)
+        _, fin, duracion = self.tareas()
+        if not len(fin):
+            return []
+        dias, inverso = np.unique(self._dias_locales()[fin], return_inverse=True)
+        segundos = np.bincount(inverso, weights=duracion)
+        return [(_fecha(d), int(s)) for d, s in zip(dias, segundos)]
+
+    def histograma_tiempo(self, limites_horas=HISTOGRAMA_HORAS):
+        """Número de tareas por rango de duración; la última barra acumula lo que supera el límite."""
+        _, _, duracion = self.tareas()
+        limites = np.array(limites_horas + (np.inf,), dtype=np.float64)
+        cuentas, _ = np.histogram(duracion / 3600, bins=limites)
+        return [
+            {"desde_h": float(limites[i]), "hasta_h": float(limites[i + 1]) if i + 1 < len(cuentas) else None, "tareas": int(c)}
+            for i, c in enumerate(cuentas)
+        ]
+
+
+    # -----------------------------
+    #     RANGOS Y PERIODOS
+    # -----------------------------
+    def rango(self, desde=None, hasta=None):
+        """(lo, hi) de las filas con desde <= ts < hasta (epoch UTC), por búsqueda binaria sobre ts."""
+        lo = 0 if desde is None else int(np.searchsorted(self.ts, desde, side="left"))
+        hi = len(self) if hasta is None else int(np.searchsorted(self.ts, hasta, side="left"))
+        return lo, max(lo, hi)
+
+    def acumulado(self):                           # acumulado[i] = segundos de las tareas cerradas en las filas < i
+        if self._acumulado is None:
+            _, fin, duracion = self.tareas()
+            por_fila = np.zeros(len(self), dtype=np.int64)
+            por_fila[fin] = duracion
+            self._acumulado = np.concatenate(([0], np.cumsum(por_fila)))
+        return self._acumulado
+
+    def resumen_rango(self, lo, hi):
+        """Commits, tareas cerradas y tiempo de las filas [lo, hi) sin recorrerlas."""
+        _, fin, _ = self.tareas()
+        acumulado = self.acumulado()
+        return {
+            "commits": hi - lo,
+            "tareas": int(np.searchsorted(fin, hi) - np.searchsorted(fin, lo)),
+            "total": timedelta(seconds=int(acumulado[hi] - acumulado[lo])),
+        }
+
+    def periodos(self, nivel):
+        """
+        Rollup precalculado del nivel (dia, semana o mes, en la hora local de cada commit):
+        (claves ordenadas, commits, segundos, commits acumulados, segundos acumulados).
+        """
+        if nivel not in self._periodos:
+            dias = self._dias_locales()
+            claves = _clave_periodo(nivel, dias)
+            unicas, inverso = np.unique(claves, return_inverse=True)
+            _, fin, duracion = self.tareas()
+            commits = np.bincount(inverso, minlength=len(unicas)).astype(np.int64)
+            segundos = np.bincount(inverso[fin], weights=duracion, minlength=len(unicas)).astype(np.int64)
+            self._periodos[nivel] = (
+                unicas,
+                commits,
+                segundos,
+                np.concatenate(([0], np.cumsum(commits))),
+                np.concatenate(([0], np.cumsum(segundos))),
+            )
+        return self._periodos[nivel]
+
+    def rollup(self, nivel, desde=None, hasta=None):
+        """
+        Periodos del nivel entre las fechas desde y hasta (date, ambas incluidas).
+        Los totales salen de los acumulados: O(log n) aunque el rango sea enorme.
+        """
+        claves, commits, segundos, acum_commits, acum_segundos = self.periodos(nivel)
+        lo = 0 if desde is None else int(np.searchsorted(claves, _clave_fecha(nivel, desde), side="left"))
+        hi = len(claves) if hasta is None else int(np.searchsorted(claves, _clave_fecha(nivel, hasta), side="right"))
+        hi = max(lo, hi)
+        return {
+            "nivel": nivel,
+            "commits": int(acum_commits[hi] - acum_commits[lo]),
+            "segundos": int(acum_segundos[hi] - acum_segundos[lo]),
+            "periodos": [
+                {"periodo": _etiqueta_periodo(nivel, claves[i]), "commits": int(commits[i]), "segundos": int(segundos[i])}
+                for i in range(lo, hi)
+            ],
+        }
+
+
+def _clave_periodo(nivel, dias):                   # Día local (desde epoch) -> clave entera del periodo
+    if nivel == "dia":
+        return dias
+    if nivel == "semana":
+        return (dias + 3) // 7                     # Semanas que empiezan en lunes
+    if nivel == "mes":
+        return dias.astype("datetime64[D]").astype("datetime64[M]").astype(np.int64)
+    raise ValueError(f"Nivel de periodo desconocido: {nivel}")
+
+
+def _clave_fecha(nivel, fecha):                    # date -> clave del periodo que la contiene
+    dia = (fecha - date(1970, 1, 1)).days
+    return int(_clave_periodo(nivel, np.array([dia], dtype=np.int64))[0])
+
+
+def _etiqueta_periodo(nivel, clave):
+    if nivel == "dia":
+        return _fecha(clave)
+    if nivel == "semana":
+        return _fecha(clave * 7 - 3)               # Lunes de la semana
+    return str(np.datetime64(int(clave), "M"))     # 'YYYY-MM'
+
+
+def _fecha(dia_epoch):                             # Día desde epoch -> 'YYYY-MM-DD'
+    return (date(1970, 1, 1) + timedelta(days=int(dia_epoch))).isoformat()
+
+
+# -----------------------------
+#   CACHÉ COMPARTIDA (mmap)
+# -----------------------------
+COLUMNAS = ("sha", "ts", "tz", "kind", "msg_bytes", "msg_offsets")
+
+
+class _Mensajes:
+    """Mensajes guardados como bytes UTF-8 concatenados + offsets; se decodifican al pedirlos."""
+
+    def __init__(self, datos, offsets):
+        self.datos = datos
+        self.offsets = offsets
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i):
+        return self.datos[self.offsets[i]:self.offsets[i + 1]].tobytes().decode("utf-8")
+
+
+def _carpeta_repo(repo_path):                      # Prefijo de las carpetas de un repo dentro de SHARED_CACHE_DIR
+    return hashlib.sha1(os.path.abspath(repo_path).encode("utf-8")).hexdigest()[:12]
+
+
+def _guardar_compartido(path, store):
+    """Escribe las columnas en una carpeta temporal y la renombra: nadie ve una versión a medias."""
+    codificados = [m.encode("utf-8") for m in store.messages]
+    offsets = np.zeros(len(codificados) + 1, dtype=np.int64)
+    np.cumsum([len(m) for m in codificados], out=offsets[1:])
+    columnas = {
+        "sha": store.sha,
+        "ts": store.ts,
+        "tz": store.tz,
+        "kind": store.kind,
+        "msg_bytes": np.frombuffer(b"".join(codificados), dtype=np.uint8),
+        "msg_offsets": offsets,
+    }
+    tmp = f"{path}.tmp{os.getpid()}-{threading.get_ident()}"
+    try:
+        os.makedirs(tmp)
+        for nombre, columna in columnas.items():
+            np.save(os.path.join(tmp, f"{nombre}.npy"), columna)
+        os.replace(tmp, path)
+    except OSError:
+        shutil.rmtree(tmp, ignore_errors=True)     # Otro proceso ganó la carrera o no hay permisos: vale la suya
+
+
+def _cargar_compartido(path):                      # CommitStore sobre mmap (solo lectura) o None si no existe
+    try:
+        c = {n: np.load(os.path.join(path, f"{n}.npy"), mmap_mode="r") for n in COLUMNAS}
+    except (OSError, ValueError):
+        return None
+    return CommitStore(c["sha"], c["ts"], c["tz"], c["kind"], _Mensajes(c["msg_bytes"], c["msg_offsets"]))
+
+
+def _podar_compartido(repo_path, actual):          # Borra las versiones de HEADs anteriores del repo
+    prefijo = _carpeta_repo(repo_path) + "-"
+    try:
+        nombres = os.listdir(SHARED_CACHE_DIR)
+    except OSError:
+        return
+    for nombre in nombres:
+        if nombre.startswith(prefijo) and nombre != actual and "." not in nombre:
+            shutil.rmtree(os.path.join(SHARED_CACHE_DIR, nombre), ignore_errors=True)   # En Windows falla si otro proceso lo tiene abierto
+
+
+def _store_compartido(repo_path, head):
+    """
+    CommitStore del HEAD desde la caché en disco compartida por todos los procesos.
+    Si no existe, lo construye un solo proceso (lock con O_EXCL) y el resto espera
+    a que aparezca en lugar de lanzar su propio git log.
+    """
+    nombre = f"{_carpeta_repo(repo_path)}-{head}"
+    path = os.path.join(SHARED_CACHE_DIR, nombre)
+    lock = f"{path}.lock"
+
+    while True:
+        store = _cargar_compartido(path)
+        if store is not None:
+            registrar_cache("commit_store_compartido", True)
+            return store
+        try:
+            os.makedirs(SHARED_CACHE_DIR, exist_ok=True)
+            fd = os.open(lock, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+            break                                  # Este proceso construye
+        except FileExistsError:
+            try:
+                abandonado = time.time() - os.path.getmtime(lock) > SHARED_CACHE_LOCK_TIMEOUT
+            except OSError:
+                continue                           # El lock acaba de liberarse: volver a mirar
+            if abandonado:
+                try:
+                    os.remove(lock)
+                except OSError:
+                    pass
+                continue
+            time.sleep(0.05)
+        except OSError:
+            return None                            # Carpeta no escribible: cada proceso usa su copia en memoria
+
+    registrar_cache("commit_store_compartido", False)
+    try:
+        store = CommitStore.from_commits(get_cached_commits(repo_path))
+        if len(store):
+            _guardar_compartido(path, store)
+            _podar_compartido(repo_path, nombre)
+            store = _cargar_compartido(path) or store   # Los demás procesos comparten estas mismas páginas
+        return store
+    finally:
+        os.close(fd)
+        try:
+            os.remove(lock)
+        except OSError:
+            pass
+
+
+def get_commit_store(repo_path):
+    """
+    CommitStore del repo, reconstruido solo cuando cambia HEAD (None si falta NumPy).
+    Con SHARED_CACHE_ENABLED las columnas viven en ficheros mmap compartidos por
+    todos los procesos del servidor en lugar de una copia por proceso.
+    """
+    if not NUMPY_DISPONIBLE:
+        return None
+    head = get_head_sha(repo_path)
+    with _cache.lock(repo_path):                   # Peticiones simultáneas del mismo repo construyen una sola vez
+        memo = _cache.memoria.get(repo_path)
+        if memo and memo[0] == head:
+            registrar_cache("commit_store", True)
+            return memo[1]
+        registrar_cache("commit_store", False)
+        store = None
+        if SHARED_CACHE_ENABLED and head is not None:
+            store = _store_compartido(repo_path, head)
+        if store is None:
+            store = CommitStore.from_commits(get_cached_commits(repo_path))
+        _cache.memoria[repo_path] = (head, store)
+        return store
@@ -0,0 +1,90 @@
+import threading                                  # Flask atiende varias peticiones a la vez
+from collections import OrderedDict               # Orden de uso para el desalojo LRU
+
+from helpers.metrics import registrar_cache
+from config.settings import FRAGMENT_CACHE_MAX_BYTES
+
+
+class FragmentCache:
+    """
+    LRU de fragmentos HTML ya renderizados, acotada por memoria.
+
+    La clave es (repo_path, head, versión del push_log, nombre del fragmento...):
+    un fragmento nunca se queda viejo, simplemente deja de pedirse y acaba
+    desalojado. invalidar_repo() libera la memoria de un repo de inmediato.
+    """
+
+    def __init__(self, max_bytes=FRAGMENT_CACHE_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self.aciertos = 0
+        self.fallos = 0
+        self.desalojos = 0
+        self._datos = OrderedDict()               # clave -> (valor, tamaño en bytes)
+        self._lock = threading.Lock()
+
+    def obtener(self, clave):                     # Valor guardado (y lo marca como recién usado) o None
+        with self._lock:
+            entrada = self._datos.get(clave)
+            if entrada is None:
+                self.fallos += 1
+            else:
+                self.aciertos += 1
+                self._datos.move_to_end(clave)
+        registrar_cache("fragmentos", entrada is not None)
+        return entrada[0] if entrada else None
+
+    def guardar(self, clave, valor, tamano):
+        if tamano > self.max_bytes:
+            return                                # Un fragmento más grande que toda la caché no se guarda
+        with self._lock:
+            anterior = self._datos.pop(clave, None)
+            if anterior:
+                self.bytes -= anterior[1]
+            self._datos[clave] = (valor, tamano)
+            self.bytes += tamano
+            while self.bytes > self.max_bytes:
+                _, (_, liberado) = self._datos.popitem(last=False)
+                self.bytes -= liberado
+                self.desalojos += 1
+
+    def invalidar_repo(self, repo_path):          # Descarta todos los fragmentos de un repo
+        with self._lock:
+            for clave in [c for c in self._datos if c[0] == repo_path]:
+                self.bytes -= self._datos.pop(clave)[1]
+
+    def limpiar(self):
+        with self._lock:
+            self._datos.clear()
+            self.bytes = 0
+
+    def estadisticas(self):
+        with self._lock:
+            return {
+                "entradas": len(self._datos),
+                "bytes": self.bytes,
+                "max_bytes": self.max_bytes,
+                "aciertos": self.aciertos,
+                "fallos": self.fallos,
+                "desalojos": self.desalojos,
+            }
+
+
+fragmentos = FragmentCache()
+
+
+def obtener_fragmento(clave, renderizar):
+    """
+    Devuelve el valor cacheado para clave o lo genera con renderizar().
+    renderizar devuelve (html, extra): extra son datos que acompañan al
+    fragmento (p. ej. el cursor de la siguiente página) y se cachean con él.
+    """
+    valor = fragmentos.obtener(clave)
+    if valor is None:
+        valor = renderizar()
+        fragmentos.guardar(clave, valor, len(valor[0].encode("utf-8")))
+    return valor
+
+
+def invalidar_repo(repo_path):
+    fragmentos.invalidar_repo(repo_path)
@@ -1,95 +1,327 @@
 import os                                   # Para manejar rutas de archivos y carpetas
-from datetime import (                      # Para trabajar con fechas y duraciones
-    datetime, 
-    timedelta
+import queue                                # Para pasar el resultado del hilo de trabajo al hilo de Tk
+import threading                            # Carga de commits fuera del hilo de la ventana
+import time                                 # Plazo máximo sin noticias de un push
+from git_utils.push_log import contar_pushes   # Cuenta los pushes del log leyendo solo lo nuevo
+from git_utils.push_jobs import (           # Cola de pushes en segundo plano
+    enviar_push,
+    estado_push,
+    enviar_push_masivo,
+    estado_lote,
+    terminado,
+    ERROR,
+    COMPLETADO,
+    FALLIDO
 )
-from git_utils.git_operations import (      # Importa funciones que obtienen commits, hacen push y leen el log de pushes
-    get_local_commits,
-    git_push_and_log,
-    get_push_dates_from_log
-)
-from helpers.time_utils import (            # Importa funciones que calculan duración de tareas y las formatean
-    map_task_duration, 
+from git_utils.commit_cache import get_cached_commits   # Commits del repo leídos a través de la caché por HEAD
+from git_utils import repo_watcher          # Avisos cuando cambian las refs o push_log.txt
+from helpers.task_summary import get_task_summary       # Totales de tareas materializados (compartidos con la web)
+from helpers.time_utils import (            # Importa el motor de tareas y el formateo de duraciones
+    calcular_timeline, 
     format_timedelta
 )
-from config.settings import BRANCH          # Importa la rama por defecto para push
+from config.settings import (               # Rama por defecto, intervalos de sondeo y tamaño de lote del Treeview
+    BRANCH,
+    PUSH_POLL_MS,
+    PUSH_POLL_LIMIT,
+    PUSH_TIMEOUT,
+    TREE_CHUNK_SIZE,
+    TREE_POLL_MS,
+    WATCH_POLL_MS
+)
 from tkinter import messagebox              # Para mostrar alertas en ventanas
 
-def cargar_commits(                                    # Carga commits en la tabla y actualiza panel superior
+_cargas = {}                                # str(tree) -> {"id": carga en curso, "valores": {iid: values mostrados}}
+
+
+def _preparar_filas(path):                                                            # Se ejecuta en un hilo: git + cálculo, sin tocar Tk
+    log_file = os.path.join(path, "push_log.txt")                                     # Ruta al archivo de log de pushes
+    commits = get_cached_commits(path)                                                # Obtiene todos los commits locales del repo (vía caché)
+    pushes = contar_pushes(log_file)                                                  # Número de pushes del log, sin copiar el índice
+    timeline = calcular_timeline(commits)                                             # Duración de cada fila en una sola pasada
+    resumen = get_task_summary(path)                                                  # Total, inicio y [END] sin recorrer toda la historia
+
+    filas = []
+    for fila in reversed(timeline["filas"]):                                          # Recorre del más nuevo al más antiguo, como git log
+        sha_short = fila.commit.sha_corto                                             # SHA corto para mostrar en la tabla
+        commit_str = fila.dt.replace(tzinfo=None).strftime("%Y-%m-%d %H:%M:%S")    # Formatea fecha sin zona horaria para mostrar
+        duracion_tarea = ""                                                           # Inicializa duración de tarea vacía
+        if fila.duracion is not None:                                                 # Verifica si el commit cierra una tarea
+            duracion_tarea = format_timedelta(fila.duracion)                          # Obtiene su duración formateada
+        filas.append((                                                                # iid = SHA completo para poder comparar con lo ya mostrado
+            fila.sha,
+            (sha_short, commit_str, duracion_tarea, fila.message)
+        ))
+    return commits, pushes, resumen, filas
+
+
+def cargar_commits(                                    # Carga commits en la tabla sin bloquear la ventana y actualiza panel superior
         path, 
         tree, 
         lbl_commits, 
         lbl_pushes, 
-        lbl_total_time
+        lbl_total_time,
+        on_done=None,                                  # Callback opcional con el resumen de tareas cuando la tabla está completa
+        progreso=None,                                 # Callback opcional (hechas, total) tras cada lote insertado
+        al_fallar=None                                 # Callback opcional con la excepción si la carga falla
 ):
-    log_file = os.path.join(path, "push_log.txt")      # Ruta al archivo de log de pushes
-    commits = get_local_commits(path)                  # Obtiene todos los commits locales del repo
-    push_dates = get_push_dates_from_log(log_file)     # Obtiene las fechas de pushes desde el log
-    task_map = map_task_duration(commits)              # Calcula duración de tareas a partir de commits
-
-    # Limpiar tabla
-    for row in tree.get_children():
-        tree.delete(row)                               # Elimina todas las filas anteriores del Treeview
-
-    total_duration = timedelta()                                                      # Inicializa duración total en cero
-    for c in commits:                                                                 # Recorre cada commit
-        sha_short = c['sha'][:7]                                                      # SHA corto para mostrar en la tabla
-        commit_dt = datetime.fromisoformat(c['commit_date']).replace(tzinfo=None)     # Convierte la fecha ISO a datetime sin zona horaria
-        commit_str = commit_dt.strftime("%Y-%m-%d %H:%M:%S")                          # Formatea fecha para mostrar
-        duracion_tarea = ""                                                           # Inicializa duración de tarea vacía
-        if sha_short in task_map:                                                     # Verifica si el commit se asocia a una tarea
-            duracion_tarea = format_timedelta(task_map[sha_short]["duracion"])        # Obtiene su duración formateada
-            total_duration += task_map[sha_short]["duracion"]                         # Suma a duración total
-        tree.insert(                                                                  # Inserta fila en la tabla con SHA, fecha, duración y mensaje
-            "", 
-            "end", 
-            values=(
-                sha_short,
-                commit_str, 
-                duracion_tarea, 
-                c['message']
-            )
-        )
+    estado = _cargas.setdefault(str(tree), {"id": 0, "valores": {}})
+    estado["id"] += 1                                  # Una carga nueva invalida la anterior si aún no terminó
+    carga_id = estado["id"]
+    resultado = queue.Queue(maxsize=1)
+
+    def trabajar():                                    # Hilo de trabajo: nunca toca widgets
+        try:
+            resultado.put(_preparar_filas(path))
+        except Exception as e:
+            resultado.put(e)
+
+    threading.Thread(target=trabajar, daemon=True).start()
+
+    def esperar():                                     # Hilo de Tk: recoge el resultado cuando está listo
+        if carga_id != estado["id"]:
+            return
+        try:
+            res = resultado.get_nowait()
+        except queue.Empty:
+            tree.after(TREE_POLL_MS, esperar)
+            return
+        if isinstance(res, Exception):
+            messagebox.showerror("Commits", f"No se pudieron cargar los commits: {res}")
+            if al_fallar:
+                al_fallar(res)
+            return
+        aplicar(*res)
 
-    # Actualizar panel superior
-    lbl_commits.config(text=f"Commits: {len(commits)}")                               # Actualiza número de commits
-    lbl_pushes.config(text=f"Pushes: {len(push_dates)}")                              # Actualiza número de pushes
-    lbl_total_time.config(text=f"Tiempo total trabajado: {str(total_duration)}")  
-    
-    return commits
+    def aplicar(commits, pushes, resumen, filas):
+        valores = estado["valores"]
+        nuevos = {iid for iid, _ in filas}
 
+        # Quitar filas que ya no existen (p. ej. tras un rebase)
+        actuales = list(tree.get_children())
+        obsoletos = [iid for iid in actuales if iid not in nuevos]
+        if obsoletos:
+            tree.delete(*obsoletos)
+            for iid in obsoletos:
+                valores.pop(iid, None)
 
-def hacer_push(                                             # Hace push y refresca la tabla
+        # Si las filas conservadas cambiaron de orden, no vale el diff: vaciar la tabla
+        conservados = [iid for iid in actuales if iid in nuevos]
+        if conservados != [iid for iid, _ in filas if iid in valores]:
+            tree.delete(*conservados)
+            valores.clear()
+
+        # Solo se insertan/actualizan las filas que difieren de lo mostrado
+        pendientes = [(i, iid, vals) for i, (iid, vals) in enumerate(filas) if valores.get(iid) != vals]
+        total = len(pendientes)
+
+        def lote(desde):
+            if carga_id != estado["id"]:
+                return                                 # Otra carga más reciente tomó el relevo
+            for i, iid, vals in pendientes[desde:desde + TREE_CHUNK_SIZE]:
+                if iid in valores:
+                    tree.item(iid, values=vals)
+                else:
+                    tree.insert("", i, iid=iid, values=vals)   # Las filas anteriores ya están en su sitio
+                valores[iid] = vals
+            hechas = min(desde + TREE_CHUNK_SIZE, total)
+            if progreso:
+                progreso(hechas, total)
+            if hechas < total:
+                tree.after(1, lote, hechas)            # Deja respirar al bucle de eventos entre lotes
+                return
+
+            # Actualizar panel superior
+            lbl_commits.config(text=f"Commits: {len(commits)}")                       # Actualiza número de commits
+            lbl_pushes.config(text=f"Pushes: {pushes}")                               # Actualiza número de pushes
+            lbl_total_time.config(text=f"Tiempo total trabajado: {str(resumen['total'])}")
+            if on_done:
+                on_done(resumen)                       # Devuelve el resumen de tareas para el resto de estadísticas
+
+        lote(0)
+
+    tree.after(TREE_POLL_MS, esperar)
+
+
+def _sin_avance(seguimiento, estado):                        # True si estado lleva PUSH_POLL_LIMIT s sin cambiar
+    ahora = time.monotonic()
+    if seguimiento.get("estado") != estado or "desde" not in seguimiento:
+        seguimiento.update(estado=estado, desde=ahora)
+    return ahora - seguimiento["desde"] > PUSH_POLL_LIMIT
+
+
+def _consultar(estado, registro_id):                        # None si el estado no se puede leer o ya no existe
+    try:
+        return estado(registro_id)
+    except Exception:
+        return None
+
+
+def hacer_push(                                             # Lanza el push en segundo plano y refresca la tabla al terminar
         path, 
         tree, 
         lbl_commits, 
         lbl_pushes, 
-        lbl_total_time
+        lbl_total_time,
+        on_done=None,                                       # Callback opcional con el resumen de tareas tras refrescar la tabla
+        al_fallar=None                                      # Callback opcional si la tabla no se pudo refrescar
 ):
     log_file = os.path.join(                                # Ruta al log de pushes
         path, 
         "push_log.txt"
     )
-    push_result = git_push_and_log(                         # Ejecuta git push y guarda SHA y timestamp en el log
+    job_id = enviar_push(                                   # Encola git push + log sin bloquear la ventana
         path, 
         BRANCH, 
-        log_file
+        log_file,
+        timeout=PUSH_TIMEOUT                                # Un push colgado no ocupa un hilo para siempre
     )
-    if push_result:
-        sha_push, push_time = push_result
-        messagebox.showinfo(
-            "Push", 
-            f"Push realizado: {sha_push} a las {push_time}" # Mensaje informando push exitoso
-        )
-    else:
-        messagebox.showinfo(                                
-            "Push", 
-            "No había cambios para hacer push."             # Mensaje si no había nada que pushear
+
+    seguimiento = {}
+
+    def comprobar():                                        # Se ejecuta en el hilo de Tk vía after()
+        job = _consultar(estado_push, job_id)
+        if job is None or (not terminado(job) and _sin_avance(seguimiento, job["estado"])):
+            error = "No se pudo saber cómo terminó el push." if job is None else "El push no avanza; se da por fallido."
+            messagebox.showerror("Push", error)
+            if al_fallar:
+                al_fallar(RuntimeError(error))
+            return
+        if not terminado(job):
+            tree.after(PUSH_POLL_MS, comprobar)             # Sigue en curso: vuelve a mirar más tarde
+            return
+        if job["estado"] == ERROR:
+            messagebox.showerror(
+                "Push", 
+                f"Error en el push: {job['error']}"
+            )
+        elif job["resultado"]:
+            sha_push, push_time = job["resultado"]
+            messagebox.showinfo(
+                "Push", 
+                f"Push realizado: {sha_push} a las {push_time}" # Mensaje informando push exitoso
+            )
+        else:
+            messagebox.showinfo(                                
+                "Push", 
+                "No había cambios para hacer push."             # Mensaje si no había nada que pushear
+            )
+        cargar_commits(                                     # Refresca la tabla, el panel superior y el resumen después del push
+            path, 
+            tree, 
+            lbl_commits, 
+            lbl_pushes, 
+            lbl_total_time,
+            on_done=on_done,
+            al_fallar=al_fallar
         )
-    cargar_commits(                                         # Refresca la tabla y panel superior después del push
-        path, 
-        tree, 
-        lbl_commits, 
-        lbl_pushes, 
-        lbl_total_time
+
+    tree.after(PUSH_POLL_MS, comprobar)
+    return job_id
+
+
+def hacer_push_masivo(                                      # Push de varios repos a la vez y un único informe al terminar
+        repos,                                              # {repo_id: ruta}, como obtener_repositorios
+        widget,
+        on_done=None,                                       # Callback opcional (en el hilo de Tk) con el informe del lote
+        al_fallar=None                                      # Callback opcional si no se pudo seguir el lote hasta el final
+):
+    lote_id = enviar_push_masivo(                           # Concurrencia limitada a PUSH_WORKERS y timeout por repo
+        repos,
+        BRANCH,
+        timeout=PUSH_TIMEOUT
     )
+
+    seguimiento = {}
+
+    def comprobar():                                        # Se ejecuta en el hilo de Tk vía after()
+        lote = _consultar(estado_lote, lote_id)
+        if lote is None or lote["estado"] == ERROR or (
+                not terminado(lote) and _sin_avance(seguimiento, lote["pendientes"])):
+            if lote is None:
+                error = "No se pudo saber cómo terminó el push masivo."
+            elif lote["estado"] == ERROR:
+                error = f"El push masivo falló: {lote.get('error')}"
+            else:
+                error = f"El push masivo no avanza ({lote['pendientes']} pendientes); se da por fallido."
+            messagebox.showerror("Push masivo", error)
+            if al_fallar:
+                al_fallar(RuntimeError(error))
+            return
+        if lote["estado"] != COMPLETADO:
+            widget.after(PUSH_POLL_MS, comprobar)
+            return
+        fallos = [
+            f"{os.path.basename(os.path.normpath(r['repo']))}: {r['error']}"
+            for r in lote["repos"].values() if r["estado"] == FALLIDO
+        ]
+        informe = (
+            f"Subidos: {lote['ok']}\n"
+            f"Sin cambios: {lote['sin_cambios']}\n"
+            f"Con error: {lote['fallido']}"
+        )
+        if fallos:
+            messagebox.showwarning("Push masivo", informe + "\n\n" + "\n".join(fallos))
+        else:
+            messagebox.showinfo("Push masivo", informe)
+        if on_done:
+            on_done(lote)
+
+    widget.after(PUSH_POLL_MS, comprobar)
+    return lote_id
+
+
+def vigilar_repo(                                           # Llama a al_cambiar (en el hilo de Tk) cuando cambian refs o push_log.txt
+        path,
+        widget,
+        al_cambiar
+):
+    cola = repo_watcher.suscribir(path)                     # El hilo vigilante deja los avisos en esta cola
+    activo = {"si": True}
+
+    def comprobar():
+        if not activo["si"]:
+            return
+        cambios = False
+        while not cola.empty():                             # Varios avisos seguidos se agrupan en una sola recarga
+            cola.get_nowait()
+            cambios = True
+        if cambios:
+            al_cambiar()
+        widget.after(WATCH_POLL_MS, comprobar)
+
+    def cancelar():                                         # Deja de vigilar (p. ej. al cambiar de repo)
+        activo["si"] = False
+        repo_watcher.cancelar(path, cola)
+
+    widget.after(WATCH_POLL_MS, comprobar)
+    return cancelar
+
+
+def en_segundo_plano(                                       # Ejecuta trabajo() en un hilo y entrega el resultado en el hilo de Tk
+        widget,
+        trabajo,
+        al_terminar,
+        al_fallar=None
+):
+    resultado = queue.Queue(maxsize=1)
+
+    def trabajar():                                         # Hilo de trabajo: nunca toca widgets
+        try:
+            resultado.put((True, trabajo()))
+        except Exception as e:
+            resultado.put((False, e))
+
+    def esperar():                                          # Hilo de Tk: recoge el resultado cuando está listo
+        try:
+            ok, valor = resultado.get_nowait()
+        except queue.Empty:
+            widget.after(TREE_POLL_MS, esperar)
+            return
+        if ok:
+            al_terminar(valor)
+        elif al_fallar:
+            al_fallar(valor)
+
+    threading.Thread(target=trabajar, daemon=True).start()
+    widget.after(TREE_POLL_MS, esperar)
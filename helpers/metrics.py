@@ -0,0 +1,101 @@
+import time                                   # Reloj monotónico para medir etapas
+import threading                              # Registro compartido entre hilos y tiempos por petición
+from contextlib import contextmanager
+
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)   # Límites (s) de los histogramas de latencia
+
+_lock = threading.Lock()
+_etapas = {}                                  # etapa -> {"buckets": [...], "count": n, "sum": s}
+_subprocesos = {}                             # subcomando git -> {"count": n, "sum": s, "errores": n}
+_caches = {}                                  # nombre de caché -> {"hit": n, "miss": n}
+_peticion = threading.local()                 # Tiempos de la petición en curso para Server-Timing
+
+
+def observar(etapa, segundos):               # Añade una medida al histograma de la etapa
+    with _lock:
+        h = _etapas.setdefault(etapa, {"buckets": [0] * len(BUCKETS), "count": 0, "sum": 0.0})
+        for i, limite in enumerate(BUCKETS):
+            if segundos <= limite:
+                h["buckets"][i] += 1
+        h["count"] += 1
+        h["sum"] += segundos
+    tiempos = getattr(_peticion, "tiempos", None)
+    if tiempos is not None:
+        tiempos[etapa] = tiempos.get(etapa, 0.0) + segundos
+
+
+@contextmanager
+def medir_etapa(etapa):
+    """Mide el bloque y lo suma al histograma de la etapa (y al Server-Timing de la petición)."""
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        observar(etapa, time.perf_counter() - t0)
+
+
+def registrar_subproceso(subcomando, segundos, error=False):   # Un proceso git terminado
+    with _lock:
+        s = _subprocesos.setdefault(subcomando, {"count": 0, "sum": 0.0, "errores": 0})
+        s["count"] += 1
+        s["sum"] += segundos
+        if error:
+            s["errores"] += 1
+    observar("git", segundos)
+
+
+def registrar_cache(nombre, acierto):         # Acierto o fallo de una caché
+    with _lock:
+        c = _caches.setdefault(nombre, {"hit": 0, "miss": 0})
+        c["hit" if acierto else "miss"] += 1
+
+
+# -----------------------------
+#     TIEMPOS POR PETICIÓN
+# -----------------------------
+def iniciar_peticion():
+    _peticion.tiempos = {}
+
+
+def terminar_peticion():
+    """Devuelve el valor de la cabecera Server-Timing de la petición y limpia el estado."""
+    tiempos = getattr(_peticion, "tiempos", None) or {}
+    _peticion.tiempos = None
+    return ", ".join(f"{etapa};dur={seg * 1000:.1f}" for etapa, seg in tiempos.items())
+
+
+# -----------------------------
+#      EXPORTACIÓN
+# -----------------------------
+def exportar_prometheus():
+    """Texto en formato de exposición de Prometheus (version 0.0.4)."""
+    lineas = []
+    with _lock:
+        lineas.append("# HELP methub_stage_seconds Latencia por etapa del camino caliente.")
+        lineas.append("# TYPE methub_stage_seconds histogram")
+        for etapa, h in sorted(_etapas.items()):
+            for limite, n in zip(BUCKETS, h["buckets"]):
+                lineas.append(f'methub_stage_seconds_bucket{{stage="{etapa}",le="{limite}"}} {n}')
+            lineas.append(f'methub_stage_seconds_bucket{{stage="{etapa}",le="+Inf"}} {h["count"]}')
+            lineas.append(f'methub_stage_seconds_sum{{stage="{etapa}"}} {h["sum"]:.6f}')
+            lineas.append(f'methub_stage_seconds_count{{stage="{etapa}"}} {h["count"]}')
+
+        lineas.append("# HELP methub_git_subprocess_total Procesos git lanzados por subcomando.")
+        lineas.append("# TYPE methub_git_subprocess_total counter")
+        for sub, s in sorted(_subprocesos.items()):
+            lineas.append(f'methub_git_subprocess_total{{command="{sub}"}} {s["count"]}')
+        lineas.append("# HELP methub_git_subprocess_seconds_total Tiempo total en procesos git por subcomando.")
+        lineas.append("# TYPE methub_git_subprocess_seconds_total counter")
+        for sub, s in sorted(_subprocesos.items()):
+            lineas.append(f'methub_git_subprocess_seconds_total{{command="{sub}"}} {s["sum"]:.6f}')
+        lineas.append("# HELP methub_git_subprocess_errors_total Procesos git que terminaron con error.")
+        lineas.append("# TYPE methub_git_subprocess_errors_total counter")
+        for sub, s in sorted(_subprocesos.items()):
+            lineas.append(f'methub_git_subprocess_errors_total{{command="{sub}"}} {s["errores"]}')
+
+        lineas.append("# HELP methub_cache_requests_total Consultas a cada caché por resultado.")
+        lineas.append("# TYPE methub_cache_requests_total counter")
+        for nombre, c in sorted(_caches.items()):
+            for resultado in ("hit", "miss"):
+                lineas.append(f'methub_cache_requests_total{{cache="{nombre}",result="{resultado}"}} {c[resultado]}')
+    return "\n".join(lineas) + "\n"
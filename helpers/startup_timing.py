@@ -0,0 +1,36 @@
+import time                                   # Reloj monotónico para las marcas de arranque
+import logging                                # El informe se escribe en el log de la aplicación
+import threading                              # Las marcas pueden llegar desde hilos de fondo
+
+from helpers.metrics import observar
+
+_inicio = time.perf_counter()                 # Origen: primer import de este módulo (hacerlo al principio del arranque)
+_marcas = []                                  # [(etapa, segundos desde _inicio)]
+_lock = threading.Lock()
+_log = logging.getLogger("methub.arranque")
+
+
+def marcar(etapa):
+    """Registra que la etapa terminó ahora; también va al histograma 'arranque' de las métricas."""
+    segundos = time.perf_counter() - _inicio
+    with _lock:
+        anterior = _marcas[-1][1] if _marcas else 0.0
+        _marcas.append((etapa, segundos))
+    observar("arranque", segundos - anterior)
+    return segundos
+
+
+def informe():                                # Lista de {etapa, ms (desde el inicio), delta_ms (desde la marca anterior)}
+    with _lock:
+        marcas = list(_marcas)
+    filas = []
+    anterior = 0.0
+    for etapa, segundos in marcas:
+        filas.append({"etapa": etapa, "ms": round(segundos * 1000, 1), "delta_ms": round((segundos - anterior) * 1000, 1)})
+        anterior = segundos
+    return filas
+
+
+def registrar_informe(titulo="Arranque"):     # Escribe el informe en el log (para seguir el arranque en frío entre versiones)
+    lineas = [f"{titulo}:"] + [f"  {f['etapa']:<30} {f['ms']:>8.1f} ms  (+{f['delta_ms']:.1f})" for f in informe()]
+    _log.info("\n".join(lineas))
@@ -0,0 +1,129 @@
+import os                                          # Rutas y reemplazo atómico del snapshot
+import json                                        # Formato del snapshot y de cada línea del diario
+
+from config.settings import (
+    TASKS_DIR,
+    TASKS_SNAPSHOT_FILE,
+    TASKS_JOURNAL_FILE,
+    TASKS_COMPACT_EVERY
+)
+
+SNAPSHOT_VERSION = 1
+
+
+class TaskJournal:
+    """
+    Tareas persistidas como snapshot + diario de solo añadir.
+
+    Cada cambio es una línea JSON al final del diario (O(1) por clic). Al
+    arrancar se carga el snapshot y se reaplica el diario; cada
+    TASKS_COMPACT_EVERY operaciones el estado se vuelca a un snapshot nuevo y
+    el diario se vacía. Las operaciones son idempotentes (toggle guarda el
+    valor final), así que reaplicar un diario ya compactado no cambia nada.
+    """
+
+    def __init__(self, carpeta=TASKS_DIR, compactar_cada=TASKS_COMPACT_EVERY):
+        self.snapshot_path = os.path.join(carpeta, TASKS_SNAPSHOT_FILE)
+        self.journal_path = os.path.join(carpeta, TASKS_JOURNAL_FILE)
+        self.compactar_cada = compactar_cada
+        self.operaciones = 0                       # Líneas en el diario desde el último snapshot
+        self._diario = None
+        os.makedirs(carpeta, exist_ok=True)
+
+    # -----------------------------
+    #           CARGA
+    # -----------------------------
+    def cargar(self):
+        """Devuelve (tareas, siguiente_id); tareas es un dict id -> tarea en orden de inserción."""
+        tareas = {}
+        siguiente = 0
+        try:
+            with open(self.snapshot_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("version") == SNAPSHOT_VERSION:
+                for task_id, text, done in data["tareas"]:
+                    tareas[task_id] = {"id": task_id, "text": text, "done": done}
+                siguiente = data["siguiente_id"]
+        except (OSError, ValueError, KeyError, TypeError):
+            pass                                   # Sin snapshot (primer arranque) o ilegible: se parte del diario
+
+        self.operaciones = 0
+        try:
+            with open(self.journal_path, "r", encoding="utf-8") as f:
+                for linea in f:
+                    try:
+                        op = json.loads(linea)
+                    except ValueError:
+                        continue                   # Última línea a medio escribir (cierre inesperado)
+                    siguiente = max(siguiente, self._aplicar(tareas, op) + 1)
+                    self.operaciones += 1
+        except OSError:
+            pass
+
+        if self.operaciones >= self.compactar_cada:
+            self.compactar(tareas, siguiente)
+        return tareas, siguiente
+
+    @staticmethod
+    def _aplicar(tareas, op):                      # Aplica una operación del diario; devuelve su id
+        task_id = op.get("id", -1)
+        if op.get("op") == "add" and task_id not in tareas:
+            tareas[task_id] = {"id": task_id, "text": op["text"], "done": False}
+        elif op.get("op") == "toggle" and task_id in tareas:
+            tareas[task_id]["done"] = op["done"]
+        elif op.get("op") == "delete":
+            tareas.pop(task_id, None)
+        return task_id
+
+    # -----------------------------
+    #          ESCRITURA
+    # -----------------------------
+    def _escribir(self, op):
+        if self._diario is None:
+            self._diario = open(self.journal_path, "a", encoding="utf-8")
+            if self._diario.tell() and not self._termina_en_salto():
+                self._diario.write("\n")           # Aísla la línea cortada de un cierre inesperado
+        self._diario.write(json.dumps(op, ensure_ascii=False) + "\n")
+        self._diario.flush()                       # Si la app se cierra de golpe se pierde como mucho la línea en curso
+        self.operaciones += 1
+
+    def _termina_en_salto(self):
+        with open(self.journal_path, "rb") as f:
+            f.seek(-1, os.SEEK_END)
+            return f.read(1) == b"\n"
+
+    def add(self, tarea):
+        self._escribir({"op": "add", "id": tarea["id"], "text": tarea["text"]})
+
+    def toggle(self, tarea):
+        self._escribir({"op": "toggle", "id": tarea["id"], "done": tarea["done"]})
+
+    def delete(self, task_id):
+        self._escribir({"op": "delete", "id": task_id})
+
+    def quizas_compactar(self, tareas, siguiente):   # Llamar tras cada cambio: compacta cada N operaciones
+        if self.operaciones >= self.compactar_cada:
+            self.compactar(tareas, siguiente)
+
+    def compactar(self, tareas, siguiente):
+        """Escribe el snapshot de forma atómica (tmp + replace) y empieza un diario vacío."""
+        data = {
+            "version": SNAPSHOT_VERSION,
+            "siguiente_id": siguiente,
+            "tareas": [[t["id"], t["text"], t["done"]] for t in tareas.values()],
+        }
+        tmp_path = f"{self.snapshot_path}.tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(data, f, ensure_ascii=False)
+            os.replace(tmp_path, self.snapshot_path)
+        except OSError:
+            return                                 # Se sigue usando el diario; se reintenta en la próxima compactación
+        self.cerrar()
+        open(self.journal_path, "w", encoding="utf-8").close()   # Si se corta justo antes, reaplicar el diario es inocuo
+        self.operaciones = 0
+
+    def cerrar(self):
+        if self._diario is not None:
+            self._diario.close()
+            self._diario = None
@@ -0,0 +1,163 @@
+import os                                          # Ruta del fichero de resumen dentro de .git
+import json                                        # Formato del resumen en disco
+from datetime import datetime, timedelta
+
+from git_utils.git_operations import get_head_sha, get_local_commits, is_ancestor
+from git_utils.commit_cache import get_cached_commits
+from git_utils.commit_record import Commit
+from helpers.time_utils import estado_tareas, emparejar_tarea
+from helpers.metrics import registrar_cache
+from helpers.cache_utils import CachePorRepo, escribir_atomico
+from config.settings import TASK_SUMMARY_FILE, TASK_SUMMARY_VERSION
+
+_cache = CachePorRepo()                            # memoria: repo_path -> resumen ya cargado en este proceso
+
+
+def _summary_path(repo_path):
+    return os.path.join(repo_path, ".git", TASK_SUMMARY_FILE)
+
+
+# -----------------------------
+#    (DE)SERIALIZACIÓN
+# -----------------------------
+def _dt(valor):
+    return datetime.fromisoformat(valor) if valor else None
+
+
+def _iso(dt):
+    return dt.isoformat() if dt else None
+
+
+def _a_json(resumen):
+    end = resumen["commit_end"]
+    return {
+        "version": TASK_SUMMARY_VERSION,
+        "head": resumen["head"],
+        "commits": resumen["commits"],
+        "tareas": resumen["tareas"],
+        "total": int(resumen["total"].total_seconds()),
+        "inicio": _iso(resumen["inicio"]),
+        "ultimo": _iso(resumen["ultimo"]),
+        "commit_end": end.a_lista() if end else None,
+        "abierta": {"tarea": resumen["abierta"]["tarea"], "inicio": _iso(resumen["abierta"]["inicio"])},
+    }
+
+
+def _de_json(data):
+    end = data["commit_end"]
+    return {
+        "head": data["head"],
+        "commits": data["commits"],
+        "tareas": data["tareas"],
+        "total": timedelta(seconds=data["total"]),
+        "inicio": _dt(data["inicio"]),
+        "ultimo": _dt(data["ultimo"]),
+        "commit_end": Commit.de_lista(end) if end else None,
+        "abierta": {"tarea": data["abierta"]["tarea"], "inicio": _dt(data["abierta"]["inicio"])},
+    }
+
+
+def _leer(repo_path):                              # Resumen en disco; None si no existe, es de otra versión o está corrupto
+    try:
+        with open(_summary_path(repo_path), "r", encoding="utf-8") as f:
+            data = json.load(f)
+        if data.get("version") != TASK_SUMMARY_VERSION:
+            return None
+        return _de_json(data)
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+
+
+def _guardar(repo_path, resumen):                  # Escritura atómica, como la caché de commits
+    escribir_atomico(_summary_path(repo_path), lambda f: json.dump(_a_json(resumen), f, ensure_ascii=False))
+
+
+# -----------------------------
+#         PLEGADO
+# -----------------------------
+def _vacio():
+    return {
+        "head": None,
+        "commits": 0,
+        "tareas": 0,
+        "total": timedelta(),
+        "inicio": None,
+        "ultimo": None,                            # Fecha del último commit plegado (el checkpoint)
+        "commit_end": None,
+        "abierta": estado_tareas(),                # Tarea + sin su - todavía y su inicio
+    }
+
+
+def _filas(commits):                               # Commits ascendentes, igual que calcular_timeline
+    return sorted(reversed(commits), key=lambda c: c.ts)
+
+
+def _plegar(resumen, filas):                       # Suma filas (posteriores al checkpoint) al resumen
+    for c in filas:
+        dt = c.dt
+        if resumen["inicio"] is None:
+            resumen["inicio"] = dt
+        if resumen["commit_end"] is None and "[END]" in c.message:
+            resumen["commit_end"] = c
+        _, _, duracion = emparejar_tarea(resumen["abierta"], c.message, dt)
+        if duracion is not None:
+            resumen["total"] += duracion
+            resumen["tareas"] += 1
+        resumen["ultimo"] = dt
+    return resumen
+
+
+def _reconstruir(repo_path, head):
+    commits = get_cached_commits(repo_path)
+    resumen = _plegar(_vacio(), _filas(commits))
+    resumen["head"] = head
+    resumen["commits"] = len(commits)
+    return resumen
+
+
+def _copia(resumen):
+    return dict(resumen, abierta=dict(resumen["abierta"]))
+
+
+def get_task_summary(repo_path):
+    """
+    Resumen de tareas del repo (mismos valores que calcular_timeline) sin
+    recorrer la historia completa en cada llamada:
+        { head, commits, tareas, total, inicio, ultimo, commit_end, abierta }
+
+    - HEAD igual al guardado: se devuelve tal cual.
+    - HEAD avanzó: solo se pliegan los commits old..HEAD partiendo de la tarea
+      abierta guardada. Si alguno es más antiguo que el último plegado (el orden
+      por fecha cambiaría) se reconstruye.
+    - Historia reescrita: reconstrucción completa.
+    """
+    head = get_head_sha(repo_path)
+    if head is None:
+        return _vacio()
+
+    with _cache.lock(repo_path):
+        resumen = _cache.memoria.get(repo_path) or _leer(repo_path)
+        if resumen and resumen["head"] == head:
+            registrar_cache("task_summary", True)
+            _cache.memoria[repo_path] = resumen
+            return _copia(resumen)
+        registrar_cache("task_summary", False)
+
+        nuevo = None
+        if resumen and is_ancestor(repo_path, resumen["head"], head):
+            commits = get_local_commits(repo_path, f"{resumen['head']}..{head}")
+            filas = _filas(commits)
+            if not filas or resumen["ultimo"] is None or filas[0].dt >= resumen["ultimo"]:
+                nuevo = _plegar(_copia(resumen), filas)
+                nuevo["head"] = head
+                nuevo["commits"] += len(commits)
+        if nuevo is None:
+            nuevo = _reconstruir(repo_path, head)
+
+        _cache.memoria[repo_path] = nuevo
+        _guardar(repo_path, nuevo)
+        return _copia(nuevo)
+
+
+def invalidar_resumen(repo_path):
+    _cache.invalidar(repo_path, _summary_path(repo_path))
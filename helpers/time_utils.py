@@ -1,4 +1,6 @@
-from datetime import datetime, timedelta
+from datetime import timedelta
+
+from git_utils.commit_record import FilaTimeline
 
 def format_timedelta(delta):
     days = delta.days
@@ -7,55 +9,84 @@ def format_timedelta(delta):
     return f"{days}d {hours:02}:{minutes:02}" if days > 0 else f"{hours:02}:{minutes:02}"
 
 
-def calcular_duracion_tareas(commits):
+def estado_tareas():                             # Estado inicial del emparejado +/-: ninguna tarea abierta
+    return {"tarea": None, "inicio": None}
+
+
+def emparejar_tarea(estado, message, dt):
+    """
+    Aplica un commit (en orden ascendente) al estado del emparejado + / -.
+    Devuelve (tarea, inicio, duracion) si el commit cierra una tarea abierta;
+    si no, (None, None, None). Lo comparten calcular_timeline y el resumen
+    incremental para que las reglas sean siempre las mismas.
     """
-    Detecta tareas usando commits con + (inicio) y - (fin).
+    msg = message.strip()
+
+    # ------------------------------------------
+    # INICIO DE TAREA  (+nombre)
+    # ------------------------------------------
+    if msg.startswith("+"):
+        estado["tarea"] = msg[1:].strip()
+        estado["inicio"] = dt
+
+    # ------------------------------------------
+    # FIN DE TAREA  (-nombre)
+    # ------------------------------------------
+    elif msg.startswith("-") and estado["inicio"] is not None:
+        tarea, inicio = estado["tarea"], estado["inicio"]
+        estado["tarea"] = None                    # reset
+        estado["inicio"] = None
+        return tarea, inicio, max(dt - inicio, timedelta(0))
+
+    return None, None, None
+
+
+def calcular_timeline(commits):
+    """
+    Motor único de tareas: en una sola pasada del commit más antiguo al más
+    nuevo, empareja + (inicio) y - (fin). Recibe los Commit en el orden de
+    git log (del más nuevo al más antiguo).
     Retorna un dict:
-        { sha_fin: { tarea, inicio, fin, duracion } }
+        {
+            filas:      [ FilaTimeline ]  (ascendente; duracion solo en los -)
+            tareas:     { sha_fin: { tarea, inicio, fin, duracion } }
+            total:      timedelta con la suma de todas las tareas
+            inicio:     datetime del primer commit (o None)
+            commit_end: primera fila con [END] (o None)
+        }
     """
 
+    filas = [FilaTimeline(c) for c in reversed(commits)]
+
+    # git log ya viene casi ordenado, así que este sort es prácticamente lineal
+    filas.sort(key=lambda f: f.commit.ts)
+
     tareas = {}
-    tarea_actual = None
-    inicio_commit = None
-
-    # IMPORTANTE: recorrer commits en orden ASCENDENTE (del más antiguo al más nuevo)
-    commits_ordenados = list(reversed(commits))
-
-    for c in commits_ordenados:
-        msg = c.get("message", "").strip()
-
-        # ------------------------------------------
-        # INICIO DE TAREA  (+nombre)
-        # ------------------------------------------
-        if msg.startswith("+"):
-            tarea_actual = msg[1:].strip()
-            inicio_commit = c
-            continue
-
-        # ------------------------------------------
-        # FIN DE TAREA  (-nombre)
-        # ------------------------------------------
-        if msg.startswith("-") and tarea_actual and inicio_commit:
-
-            try:
-                inicio_dt = datetime.fromisoformat(
-                    inicio_commit["commit_date"].replace("Z", "+00:00")
-                )
-                fin_dt = datetime.fromisoformat(
-                    c["commit_date"].replace("Z", "+00:00")
-                )
-            except Exception:
-                continue
-
-            tareas[c["sha"][:7]] = {
-                "tarea": tarea_actual,
-                "inicio": inicio_dt,
-                "fin": fin_dt,
-                "duracion": fin_dt - inicio_dt,
-            }
+    total = timedelta()
+    commit_end = None
+    estado = estado_tareas()
+
+    for fila in filas:
+        c = fila.commit
+        if commit_end is None and "[END]" in c.message:
+            commit_end = fila
 
-            # reset
-            tarea_actual = None
-            inicio_commit = None
+        dt = c.dt                                 # Se construye una vez por commit y solo aquí
+        tarea, inicio, duracion = emparejar_tarea(estado, c.message, dt)
+        if duracion is not None:
+            fila.duracion = duracion
+            total += duracion
+            tareas[c.sha_corto] = {
+                "tarea": tarea,
+                "inicio": inicio,
+                "fin": dt,
+                "duracion": duracion,
+            }
 
-    return tareas
+    return {
+        "filas": filas,
+        "tareas": tareas,
+        "total": total,
+        "inicio": filas[0].dt if filas else None,
+        "commit_end": commit_end,
+    }
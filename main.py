@@ -1,16 +1,91 @@
 import os
-from flask import Flask, render_template, request, redirect, url_for
-from datetime import datetime, timedelta
+import json
+import time
+import queue
+import bisect
+import hashlib
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from flask import Flask, render_template, request, redirect, url_for, jsonify, Response, g, make_response
+from datetime import date, datetime, timedelta
 import logging
 
-from config.repo_selector import obtener_repositorios
-from git_utils.git_operations import get_local_commits, git_push_and_log, get_push_dates_from_log
-from config.settings import BRANCH
+from config.repo_selector import obtener_repositorios, reescanear_repositorios
+from git_utils.git_operations import get_head_sha, is_ancestor
+from git_utils.repo_watcher import suscribir, cancelar
+from git_utils.push_jobs import enviar_push, estado_push, enviar_push_masivo, estado_lote
+from git_utils.push_log import version_push_log, contar_pushes
+from git_utils.commit_cache import get_cached_commits
+from helpers.time_utils import calcular_timeline
+from helpers.commit_store import get_commit_store, NIVELES
+from helpers.task_summary import get_task_summary
+from helpers.fragment_cache import obtener_fragmento
+from helpers.metrics import medir_etapa, observar, registrar_cache, iniciar_peticion, terminar_peticion, exportar_prometheus
+from config.settings import BRANCH, PAGE_SIZE, MAX_PAGE_SIZE, DASHBOARD_WORKERS, SERVER_TIMING, SSE_KEEPALIVE, PUSH_TIMEOUT
 
 logging.basicConfig(level=logging.INFO)
 
 app = Flask(__name__)
 
+_timelines = {}     # repo_path -> {"head": sha, "rows": combined} para servir páginas sin recalcular
+
+@app.before_request
+def _antes_de_peticion():
+    g.inicio_peticion = time.perf_counter()
+    iniciar_peticion()
+
+
+@app.after_request
+def _despues_de_peticion(response):
+    if request.endpoint != "metrics":
+        observar("request", time.perf_counter() - g.inicio_peticion)
+    server_timing = terminar_peticion()
+    if SERVER_TIMING and server_timing:
+        response.headers["Server-Timing"] = server_timing
+    return response
+
+
+@app.route("/metrics")
+def metrics():
+    return Response(exportar_prometheus(), mimetype="text/plain; version=0.0.4")
+
+
+def validador_repo(selected_repo):
+    """Validador barato del estado del repo: HEAD + tamaño/mtime de push_log.txt."""
+    head = get_head_sha(selected_repo)
+    return f"{head}:{version_push_log(os.path.join(selected_repo, 'push_log.txt'))}"
+
+
+def calcular_etag(*partes):
+    return hashlib.sha1("|".join(str(p) for p in partes).encode("utf-8")).hexdigest()
+
+
+def respuesta_condicional(etag, generar):
+    """
+    304 sin llamar a generar() si el cliente ya tiene esta versión (If-None-Match);
+    si no, genera la respuesta y le pone el ETag. Sirve para HTML y JSON.
+    Las respuestas de error (4xx/5xx, o las que generar() marca no-store) salen
+    sin ETag para que nadie las guarde.
+    """
+    if etag in request.if_none_match:
+        registrar_cache("etag", True)
+        response = Response(status=304)
+    else:
+        registrar_cache("etag", False)
+        response = make_response(generar())
+        if response.status_code != 200 or response.cache_control.no_store:
+            return response
+    response.set_etag(etag)
+    response.headers["Cache-Control"] = "no-cache"      # El navegador guarda la página pero revalida siempre
+    return response
+
+
+PLANTILLAS_INDEX = ("index.html", "base.html", "_resumen.html", "_filas_timeline.html")   # Todo lo que renderiza index
+
+
+def version_plantillas(nombres=PLANTILLAS_INDEX):      # mtimes de las plantillas: editarlas invalida ETags y fragmentos
+    return tuple(os.path.getmtime(os.path.join(app.root_path, "templates", n)) for n in nombres)
+
+
 def format_timedelta(td: timedelta) -> str:
     """Convierte timedelta a string HH:MM:SS o MM:SS si es menor a 1h."""
     total_seconds = int(td.total_seconds())
@@ -21,29 +96,33 @@ def format_timedelta(td: timedelta) -> str:
     return f"{minutes}:{seconds:02d}"
 
 def calcular_datos_repo(selected_repo):
-    """Obtiene commits, pushes, duración total y datos de proyecto."""
-    commits = get_local_commits(selected_repo) or []
+    """Obtiene número de commits, pushes, duración total y datos de proyecto."""
     log_file = os.path.join(selected_repo, "push_log.txt")
-    push_dates = get_push_dates_from_log(log_file) or {}
+    with medir_etapa("push_log"):
+        pushes = contar_pushes(log_file)                 # Solo lee lo añadido al log, sin copiar el índice
 
-    # Convertir fechas a datetime
-    for c in commits:
-        commit_date_str = c.get('commit_date')
-        try:
-            c['_dt'] = datetime.fromisoformat(commit_date_str)
-        except Exception:
-            c['_dt'] = None
-
-    # Ordenar commits por fecha ascendente
-    commits_sorted = sorted([c for c in commits if c['_dt']], key=lambda x: x['_dt'])
+    # Totales del resumen materializado (solo pliega los commits nuevos); las filas salen
+    # del store columnar si hay NumPy (compartido entre procesos vía mmap) y si no del
+    # motor de una sola pasada, que sí necesita la lista de commits en memoria
+    with medir_etapa("resumen"):
+        timeline = get_task_summary(selected_repo)
+    with medir_etapa("timeline"):
+        store = get_commit_store(selected_repo)
+    if store is not None:
+        filas = store
+    else:
+        with medir_etapa("git_log"):
+            commits = get_cached_commits(selected_repo)
+        with medir_etapa("timeline"):
+            filas = calcular_timeline(commits)["filas"]
+    num_commits = len(filas)
 
     # Detectar fin de proyecto
-    commit_end = next((c for c in reversed(commits) if "[END]" in c.get('message', '')), None)
+    commit_end = timeline["commit_end"]
     project_finalizado = commit_end is not None
 
     # Fechas del proyecto
-    fechas = [c['_dt'] for c in commits if c['_dt']]
-    project_start_dt = min(fechas) if fechas else None
+    project_start_dt = timeline["inicio"]
 
     # Formatear fecha de inicio con hora
     if project_start_dt:
@@ -59,125 +138,493 @@ def calcular_datos_repo(selected_repo):
     else:
         project_start_formateado = ""
 
-    fecha_fin = datetime.fromisoformat(commit_end['commit_date']) if commit_end else datetime.now()
+    fecha_fin = commit_end.dt if commit_end else datetime.now()
     days_passed = (max(0, (fecha_fin.date() - project_start_dt.date()).days) if project_start_dt else 0)
 
-    # Preparar tabla combined con duraciones correctas
-    combined = []
-    last_plus_commit = None
-    for c in commits_sorted:
-        sha = c.get('sha', '')[:7]
-        message = c.get('message', '')
-        commit_datetime = c.get('_dt')
-        duracion_str = ''
-
-        if message.startswith("+") and commit_datetime:
-            last_plus_commit = c
-        elif message.startswith("-") and commit_datetime and last_plus_commit:
-            duracion_td = commit_datetime - last_plus_commit['_dt']
-            if duracion_td.total_seconds() < 0:
-                duracion_td = timedelta(0)
-            duracion_str = format_timedelta(duracion_td)
-            logging.info(f"TAREA DETECTADA: {message}, DURACIÓN: {duracion_str}")
-            last_plus_commit = None
-
-        # Formatear fecha y hora del commit
-        if commit_datetime:
-            meses = [
-                "ene", "feb", "mar", "abr", "may", "jun",
-                "jul", "ago", "sep", "oct", "nov", "dic"
-            ]
-            dia = commit_datetime.day
-            mes = meses[commit_datetime.month - 1]
-            anio = commit_datetime.year
-            fecha_formateada = f"{dia} de {mes} {anio}"
-            hora_formateada = commit_datetime.strftime("%H:%M")
-        else:
-            fecha_formateada = ""
-            hora_formateada = ""
-
-        combined.append({
-            "sha": sha,
-            "message": message,
-            "date": fecha_formateada,
-            "time": hora_formateada,
-            "duration": duracion_str if message.startswith("-") else ''
+    # Duración total de todas las tareas (sumada numéricamente)
+    total_duration_str = format_timedelta(timeline["total"])
+
+    # combined son las filas ascendentes sin formatear; paginar_timeline formatea solo la página pedida
+    return num_commits, pushes, project_start_formateado, days_passed, total_duration_str, project_finalizado, filas
+
+
+def formatear_fila(fila):
+    """Convierte una fila del timeline en la fila que muestran la plantilla y la API."""
+    meses = [
+        "ene", "feb", "mar", "abr", "may", "jun",
+        "jul", "ago", "sep", "oct", "nov", "dic"
+    ]
+    commit_datetime = fila.dt
+    duracion_str = format_timedelta(fila.duracion) if fila.duracion is not None else ''
+
+    # Formatear fecha y hora del commit
+    dia = commit_datetime.day
+    mes = meses[commit_datetime.month - 1]
+    anio = commit_datetime.year
+
+    return {
+        "sha": fila.commit.sha_corto,
+        "message": fila.message,
+        "date": f"{dia} de {mes} {anio}",
+        "time": commit_datetime.strftime("%H:%M"),
+        "duration": duracion_str
+    }
+
+
+def guardar_timeline(selected_repo, head, combined):
+    """Memoriza la tabla combined (ascendente) del repo para el HEAD indicado."""
+    _timelines[selected_repo] = {"head": head, "rows": combined}
+
+
+def obtener_timeline(selected_repo):
+    """Devuelve la tabla combined del repo, recalculándola solo si HEAD cambió."""
+    head = get_head_sha(selected_repo)
+    memo = _timelines.get(selected_repo)
+    if memo is None or memo["head"] != head:
+        registrar_cache("timeline", False)
+        combined = calcular_datos_repo(selected_repo)[6]
+        guardar_timeline(selected_repo, head, combined)
+        return combined
+    registrar_cache("timeline", True)
+    return memo["rows"]
+
+
+def paginar_timeline(combined, cursor=None, limit=PAGE_SIZE, rango=None):
+    """
+    Devuelve (filas, next_cursor) con las filas más nuevas primero.
+    El cursor es el número de filas más antiguas que quedan por mostrar, así que
+    no se desplaza cuando llegan commits nuevos por el otro extremo.
+    rango (lo, hi) limita la paginación a esas filas (filtro since/until).
+    """
+    lo, hi = rango or (0, len(combined))
+    fin = hi if cursor is None else max(lo, min(cursor, hi))
+    inicio = max(lo, fin - limit)
+    filas = [formatear_fila(f) for f in reversed(combined[inicio:fin])]
+    return filas, (inicio if inicio > lo else None)
+
+
+def parse_filtro_fecha(valor, hasta=False):
+    """
+    Fecha de un filtro since/until ('YYYY-MM-DD' o ISO 8601 completa) como datetime con zona.
+    Un until de solo fecha incluye todo ese día. Sin zona se usa la hora local del servidor.
+    Lanza ValueError si no es válida.
+    """
+    if not valor:
+        return None
+    dt = datetime.fromisoformat(valor)
+    if hasta and len(valor) == 10:
+        dt += timedelta(days=1)
+    return dt if dt.tzinfo else dt.astimezone()
+
+
+def leer_filtro(args):                            # (since, until) de la query string; ValueError si no son válidas
+    return parse_filtro_fecha(args.get("since")), parse_filtro_fecha(args.get("until"), hasta=True)
+
+
+def rango_timeline(combined, since=None, until=None):
+    """(lo, hi) de las filas con since <= fecha < until por búsqueda binaria (las filas van ordenadas por fecha)."""
+    if hasattr(combined, "rango"):
+        return combined.rango(
+            since.timestamp() if since else None,
+            until.timestamp() if until else None
+        )
+    lo = 0 if since is None else bisect.bisect_left(combined, since.timestamp(), key=lambda f: f.ts)
+    hi = len(combined) if until is None else bisect.bisect_left(combined, until.timestamp(), key=lambda f: f.ts)
+    return lo, max(lo, hi)
+
+
+def resumen_rango(combined, lo, hi):              # Commits, tareas y tiempo de las filas [lo, hi)
+    if hasattr(combined, "resumen_rango"):
+        return combined.resumen_rango(lo, hi)
+    duraciones = [f.duracion for f in combined[lo:hi] if f.duracion is not None]
+    return {"commits": hi - lo, "tareas": len(duraciones), "total": sum(duraciones, timedelta())}
+
+
+@app.route("/api/repos/rescan", methods=["POST"])
+def api_rescan():
+    return jsonify(reescanear_repositorios() or {})
+
+
+@app.route("/api/repos/<repo_id>/commits")
+def api_commits(repo_id):
+    repos_dict = obtener_repositorios() or {}
+    selected_repo = repos_dict.get(repo_id)
+    if not selected_repo:
+        return jsonify({"error": f"Repositorio {repo_id} no encontrado"}), 404
+
+    cursor = request.args.get("cursor", type=int)
+    limit = request.args.get("limit", default=PAGE_SIZE, type=int)
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+    try:
+        since, until = leer_filtro(request.args)
+    except ValueError:
+        return jsonify({"error": "since/until deben ser fechas ISO 8601 (YYYY-MM-DD)"}), 400
+
+    def generar():
+        try:
+            combined = obtener_timeline(selected_repo)
+        except Exception as e:
+            return jsonify({"error": str(e)}), 500
+
+        lo, hi = rango_timeline(combined, since, until)
+        filas, next_cursor = paginar_timeline(combined, cursor, limit, (lo, hi))
+        return jsonify({
+            "commits": filas,
+            "next_cursor": next_cursor,
+            "total": len(combined),
+            "en_rango": hi - lo
         })
 
-    # Duración total de todas las tareas
-    total_duration = sum(
-        (
-            timedelta(
-                hours=int(d.split(":")[0]),
-                minutes=int(d.split(":")[1]),
-                seconds=int(d.split(":")[2])
-            ) if len(d.split(":")) == 3 else timedelta(
-                minutes=int(d.split(":")[0]),
-                seconds=int(d.split(":")[1])
-            )
-            for d in [row['duration'] for row in combined if row['duration']]
-        ),
-        timedelta()
+    etag = calcular_etag("commits", selected_repo, validador_repo(selected_repo), cursor, limit, since, until)
+    return respuesta_condicional(etag, generar)
+
+
+@app.route("/api/repos/<repo_id>/stats")
+def api_stats(repo_id):
+    repos_dict = obtener_repositorios() or {}
+    selected_repo = repos_dict.get(repo_id)
+    if not selected_repo:
+        return jsonify({"error": f"Repositorio {repo_id} no encontrado"}), 404
+    try:
+        since, until = leer_filtro(request.args)
+    except ValueError:
+        return jsonify({"error": "since/until deben ser fechas ISO 8601 (YYYY-MM-DD)"}), 400
+
+    def generar():
+        store = get_commit_store(selected_repo)
+        if store is None:
+            return jsonify({"error": "Estadísticas no disponibles: falta NumPy"}), 501
+
+        resumen = store.resumen()
+        datos = {
+            "commits": len(store),
+            "tareas": resumen["tareas"],
+            "total_segundos": int(resumen["total"].total_seconds()),
+            "commits_por_dia": store.commits_por_dia(),
+            "commits_por_semana": store.commits_por_semana(),
+            "tiempo_por_dia": store.tiempo_por_dia(),
+            "histograma_tiempo": store.histograma_tiempo()
+        }
+        if since or until:
+            rango = store.resumen_rango(*rango_timeline(store, since, until))
+            datos["rango"] = {
+                "since": since.isoformat() if since else None,
+                "until": until.isoformat() if until else None,
+                "commits": rango["commits"],
+                "tareas": rango["tareas"],
+                "total_segundos": int(rango["total"].total_seconds())
+            }
+        return jsonify(datos)
+
+    etag = calcular_etag("stats", selected_repo, validador_repo(selected_repo), since, until)
+    return respuesta_condicional(etag, generar)
+
+
+@app.route("/api/repos/<repo_id>/rollups")
+def api_rollups(repo_id):
+    """Commits y segundos trabajados por día, semana o mes (?nivel=), opcionalmente entre since y until."""
+    repos_dict = obtener_repositorios() or {}
+    selected_repo = repos_dict.get(repo_id)
+    if not selected_repo:
+        return jsonify({"error": f"Repositorio {repo_id} no encontrado"}), 404
+
+    nivel = request.args.get("nivel", "dia")
+    if nivel not in NIVELES:
+        return jsonify({"error": f"nivel debe ser uno de: {', '.join(NIVELES)}"}), 400
+    try:
+        desde = date.fromisoformat(request.args["since"][:10]) if request.args.get("since") else None
+        hasta = date.fromisoformat(request.args["until"][:10]) if request.args.get("until") else None
+    except ValueError:
+        return jsonify({"error": "since/until deben ser fechas ISO 8601 (YYYY-MM-DD)"}), 400
+
+    def generar():
+        store = get_commit_store(selected_repo)
+        if store is None:
+            return jsonify({"error": "Estadísticas no disponibles: falta NumPy"}), 501
+        return jsonify(store.rollup(nivel, desde, hasta))
+
+    etag = calcular_etag("rollups", selected_repo, validador_repo(selected_repo), nivel, desde, hasta)
+    return respuesta_condicional(etag, generar)
+
+
+def evento_sse(evento, datos):
+    return f"event: {evento}\ndata: {json.dumps(datos, ensure_ascii=False)}\n\n"
+
+
+def resumen_vivo(selected_repo):
+    """Bloque de resumen de index.html como JSON, para actualizarlo en la página sin recargar."""
+    (_,
+     pushes,
+     project_start,
+     days_passed,
+     total_duration_str,
+     project_finalizado,
+     _) = calcular_datos_repo(selected_repo)
+    return {
+        "project_start": project_start,
+        "days_passed": days_passed,
+        "total_duration": total_duration_str,
+        "finalizado": project_finalizado,
+        "pushes": pushes
+    }
+
+
+def _sha_mas_nuevo(combined):                     # SHA de la última fila del timeline ascendente (None si está vacío)
+    return combined[len(combined) - 1:][0].sha if len(combined) else None
+
+
+@app.route("/api/repos/<repo_id>/events")
+def api_events(repo_id):
+    """
+    Server-Sent Events con los cambios del repo mientras la página está abierta:
+    - commits: filas nuevas (más nuevas primero) para insertar arriba de la tabla
+    - reset:   la historia se reescribió; la página recarga la primera página por la API
+    - resumen: nuevos valores del bloque de resumen (también tras un push)
+    """
+    repos_dict = obtener_repositorios() or {}
+    selected_repo = repos_dict.get(repo_id)
+    if not selected_repo:
+        return jsonify({"error": f"Repositorio {repo_id} no encontrado"}), 404
+
+    def generar():
+        cola = suscribir(selected_repo)
+        try:
+            head = get_head_sha(selected_repo)
+            combined = obtener_timeline(selected_repo)
+            total, ultimo = len(combined), _sha_mas_nuevo(combined)
+            yield ": conectado\n\n"
+
+            while True:
+                try:
+                    aviso = cola.get(timeout=SSE_KEEPALIVE)
+                except queue.Empty:
+                    yield ": keepalive\n\n"                    # Mantiene viva la conexión a través de proxies
+                    continue
+
+                nuevo_head = get_head_sha(selected_repo) if aviso["refs"] else head
+                if nuevo_head != head:
+                    combined = obtener_timeline(selected_repo)
+                    n = len(combined)
+                    # Solo hay delta si las filas ya enviadas siguen siendo el principio del timeline
+                    continua = (
+                        head is not None
+                        and n > total
+                        and (total == 0 or combined[total - 1:total][0].sha == ultimo)
+                        and is_ancestor(selected_repo, head, nuevo_head)
+                    )
+                    if continua:
+                        filas, _ = paginar_timeline(combined, None, n - total)
+                        yield evento_sse("commits", {"commits": filas, "total": n})
+                    elif n != total or _sha_mas_nuevo(combined) != ultimo:
+                        yield evento_sse("reset", {"total": n})
+                    # Si no, las filas ya se enviaron con el aviso anterior (HEAD cambió mientras se calculaba)
+                    head, total, ultimo = nuevo_head, n, _sha_mas_nuevo(combined)
+                yield evento_sse("resumen", resumen_vivo(selected_repo))
+        finally:
+            cancelar(selected_repo, cola)                     # El cliente cerró la página
+
+    return Response(
+        generar(),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
     )
-    total_duration_str = format_timedelta(total_duration)
 
-    return commits, push_dates, project_start_formateado, days_passed, total_duration_str, project_finalizado, combined
+
+def resumen_repo(repo_id, selected_repo):
+    """Fila del dashboard: commits, pushes, tiempo total y estado de un repo."""
+    fila = {"id": repo_id, "repo": os.path.basename(os.path.normpath(selected_repo))}
+    try:
+        resumen = get_task_summary(selected_repo)                 # Sin filas: al dashboard le basta el resumen
+        pushes = contar_pushes(os.path.join(selected_repo, "push_log.txt"))
+    except Exception as e:
+        fila["error"] = str(e)
+        return fila
+    fila.update({
+        "commits": resumen["commits"],
+        "pushes": pushes,
+        "total_duration": format_timedelta(resumen["total"]),
+        "finalizado": resumen["commit_end"] is not None
+    })
+    return fila
+
+
+@app.route("/api/dashboard")
+def api_dashboard():
+    """
+    Analiza todos los repos en paralelo y envía una línea JSON por repo según va terminando.
+    Un hilo por repo (hasta DASHBOARD_WORKERS) para que el total se acerque al del repo más lento.
+    """
+    repos_dict = obtener_repositorios() or {}
+
+    def generar():
+        if not repos_dict:
+            return
+        pool = ThreadPoolExecutor(max_workers=min(len(repos_dict), DASHBOARD_WORKERS), thread_name_prefix="dashboard")
+        futuros = [pool.submit(resumen_repo, repo_id, path) for repo_id, path in repos_dict.items()]
+        try:
+            for futuro in as_completed(futuros):
+                yield json.dumps(futuro.result(), ensure_ascii=False) + "\n"
+        finally:
+            pool.shutdown(wait=False, cancel_futures=True)   # El cliente se fue: no analizar los repos pendientes
+
+    return Response(generar(), mimetype="application/x-ndjson")
+
+
+@app.route("/dashboard")
+def dashboard():
+    repos_dict = obtener_repositorios() or {}
+    return render_template("dashboard.html", repos=repos_dict)
+
+
+@app.route("/api/push/<job_id>")
+def api_push_status(job_id):
+    job = estado_push(job_id)
+    if job is None:
+        return jsonify({"error": f"Trabajo {job_id} no encontrado"}), 404
+    return jsonify(job)
+
+
+@app.route("/api/push", methods=["POST"])
+def api_push_masivo():
+    """
+    Push de todos los repos (sin cuerpo) o de los indicados en {"repos": [repo_id, ...]}.
+    Responde 202 con el id del lote; el informe se consulta en /api/push/lote/<id>.
+    """
+    repos_dict = obtener_repositorios() or {}
+    pedidos = (request.get_json(silent=True) or {}).get("repos")
+    if pedidos is None:
+        repos = repos_dict
+    elif not isinstance(pedidos, list):
+        return jsonify({"error": "repos debe ser una lista de ids"}), 400
+    else:
+        desconocidos = [r for r in pedidos if not isinstance(r, str) or r not in repos_dict]
+        if desconocidos:
+            return jsonify({"error": f"Repositorios no encontrados: {', '.join(map(str, desconocidos))}"}), 404
+        repos = {r: repos_dict[r] for r in pedidos}
+    lote_id = enviar_push_masivo(repos, BRANCH, timeout=PUSH_TIMEOUT)
+    return jsonify({"lote": lote_id, "repos": len(repos)}), 202
+
+
+@app.route("/api/push/lote/<lote_id>")
+def api_push_lote(lote_id):
+    lote = estado_lote(lote_id)
+    if lote is None:
+        return jsonify({"error": f"Lote {lote_id} no encontrado"}), 404
+    return jsonify(lote)
 
 
 @app.route("/", methods=["GET", "POST"])
 def index():
-    error_message = None
-    selected_repo = None
-    commits = []
-    push_dates = {}
-    project_start = None
-    days_passed = 0
-    total_duration_str = "0:00"
-    project_finalizado = False
-    combined = []
-    repo_choices = []
-
     # Obtener repositorios disponibles
-    repos_dict = obtener_repositorios() or {}
+    with medir_etapa("descubrir_repos"):
+        repos_dict = obtener_repositorios() or {}
     repo_choices = list(repos_dict.values())
-    selected_repo = request.form.get("repo") or repo_choices[0] if repo_choices else None
+    selected_repo = request.values.get("repo") or repo_choices[0] if repo_choices else None
+    selected_repo_id = next((k for k, v in repos_dict.items() if v == selected_repo), None)
+
+    # Filtro opcional por fechas (?since=YYYY-MM-DD&until=YYYY-MM-DD)
+    since_str = request.values.get("since", "")
+    until_str = request.values.get("until", "")
+    try:
+        since, until = leer_filtro(request.values)
+        filtro_error = None
+    except ValueError:
+        since = until = None
+        since_str = until_str = ""
+        filtro_error = "Fechas del filtro no válidas (usa YYYY-MM-DD)"
 
     if request.method == "POST":
         action = request.form.get("action")
         log_file = os.path.join(selected_repo, "push_log.txt") if selected_repo else None
 
         if selected_repo and action == "push":
+            job_id = enviar_push(selected_repo, BRANCH, log_file, timeout=PUSH_TIMEOUT)   # No bloquea: el push corre en segundo plano
+            return redirect(url_for('index', repo=selected_repo, push_job=job_id))
+
+    def generar():
+        resumen_html = render_template("_resumen.html", project_start=None, days_passed=0, pushes=0,
+                                       total_duration="0:00", project_finalizado=False)
+        filas_html = ""
+        next_cursor = None
+        rango = None
+        error_message = filtro_error
+
+        if selected_repo:
             try:
-                git_push_and_log(selected_repo, BRANCH, log_file)
+                head = get_head_sha(selected_repo)
+                clave = (selected_repo, head, version_push_log(os.path.join(selected_repo, "push_log.txt")), version_plantillas())
+                datos = {}
+
+                def calcular():                                  # Solo se recalcula si falta algún fragmento
+                    if not datos:
+                        datos["repo"] = calcular_datos_repo(selected_repo)
+                        guardar_timeline(selected_repo, head, datos["repo"][6])
+                    return datos["repo"]
+
+                def render_resumen():
+                    _, pushes, project_start, days_passed, total_duration_str, project_finalizado, _ = calcular()
+                    return render_template(
+                        "_resumen.html",
+                        project_start=project_start,
+                        days_passed=days_passed,
+                        pushes=pushes,
+                        total_duration=total_duration_str,
+                        project_finalizado=project_finalizado
+                    ), None
+
+                def render_filas():
+                    todas = calcular()[6]
+                    lo, hi = rango_timeline(todas, since, until)             # Búsqueda binaria, sin filtrar la lista
+                    combined, next_cursor = paginar_timeline(todas, rango=(lo, hi))   # Solo la primera página; el resto llega por la API
+                    rango = None
+                    if since or until:
+                        r = resumen_rango(todas, lo, hi)
+                        rango = {"commits": r["commits"], "tareas": r["tareas"], "total": format_timedelta(r["total"])}
+                    return render_template("_filas_timeline.html", combined=combined), {"next_cursor": next_cursor, "rango": rango}
+
+                with medir_etapa("fragmentos"):
+                    resumen_html, _ = obtener_fragmento(clave + ("resumen", date.today()), render_resumen)
+                    filas_html, extra = obtener_fragmento(clave + ("filas", PAGE_SIZE, since_str, until_str), render_filas)
+                next_cursor, rango = extra["next_cursor"], extra["rango"]
             except Exception as e:
                 error_message = str(e)
-            return redirect(url_for('index'))
 
-    if selected_repo:
-        try:
-            (commits,
-             push_dates,
-             project_start,
-             days_passed,
-             total_duration_str,
-             project_finalizado,
-             combined) = calcular_datos_repo(selected_repo)
-        except Exception as e:
-            error_message = str(e)
-
-    return render_template(
-        "index.html",
-        repo_choices=repo_choices,
-        selected_repo=selected_repo,
-        commits=commits,
-        push_dates=push_dates,
-        project_start=project_start,
-        days_passed=days_passed,
-        total_duration=total_duration_str,
-        project_finalizado=project_finalizado,
-        combined=combined,
-        error_message=error_message
-    )
+        with medir_etapa("render"):
+            html = render_template(
+                "index.html",
+                repo_choices=repo_choices,
+                selected_repo=selected_repo,
+                selected_repo_id=selected_repo_id,
+                resumen_html=resumen_html,
+                filas_html=filas_html,
+                next_cursor=next_cursor,
+                page_size=PAGE_SIZE,
+                since=since_str,
+                until=until_str,
+                rango=rango,
+                push_job=request.args.get("push_job"),
+                error_message=error_message
+            )
+        response = make_response(html)
+        if error_message:
+            response.headers["Cache-Control"] = "no-store"           # Error quizá transitorio: que no se revalide con un 304
+        return response
+
+    # Sin cambios en el repo ni en push_log.txt: 304 sin recalcular ni renderizar
+    if request.method == "GET" and selected_repo and not request.args.get("push_job"):
+        with medir_etapa("validador"):
+            etag = calcular_etag(
+                "index",
+                selected_repo,
+                validador_repo(selected_repo),
+                tuple(repos_dict),
+                since_str,
+                until_str,
+                date.today(),                                    # "Días transcurridos" cambia cada día
+                version_plantillas()
+            )
+        return respuesta_condicional(etag, generar)
+    return generar()
 
 
 if __name__ == "__main__":
@@ -1,10 +1,10 @@
 import tkinter as tk
 from tkinter import ttk, messagebox
 from datetime import datetime
-import re
 
-from config.repo_selector import obtener_repositorios
-from helpers.gui_utils import cargar_commits, hacer_push
+from config.repo_selector import obtener_repositorios, reescanear_repositorios
+from helpers.gui_utils import cargar_commits, hacer_push, hacer_push_masivo, vigilar_repo, en_segundo_plano
+from helpers.startup_timing import marcar, registrar_informe
 
 
 class CommitsPage(tk.Frame):
@@ -12,6 +12,9 @@ class CommitsPage(tk.Frame):
         super().__init__(parent)
 
         self.controller = controller
+        self.repo_vigilado = None
+        self.cancelar_vigilancia = None
+        self.repositorios = {}          # repo_id -> ruta del último escaneo (para el push masivo)
         self.build_ui()
         self.apply_theme()  # aplica el tema inicial
 
@@ -91,9 +94,9 @@ class CommitsPage(tk.Frame):
         self.title_label = tk.Label(self.top_bar, text="Repositorio:", bg=t["bg"], fg=t["fg"])
         self.title_label.pack(side="left", padx=5)
 
-        repositorios = obtener_repositorios()
-        self.repo_choices = list(repositorios.values())
-        self.selected_repo = tk.StringVar(value=self.repo_choices[0])
+        # el escaneo de BASE_DIR va en segundo plano: la ventana se muestra ya y el combobox se rellena al terminar
+        self.repo_choices = []
+        self.selected_repo = tk.StringVar(value="")
 
         self.repo_menu = ttk.Combobox(
             self.top_bar,
@@ -104,12 +107,23 @@ class CommitsPage(tk.Frame):
             style="Custom.TCombobox"
         )
         self.repo_menu.pack(side="left", padx=10)
+        self.repo_menu.config(state="disabled")       # hasta que termine el escaneo
+        en_segundo_plano(
+            self,
+            lambda: obtener_repositorios() or {},
+            self.mostrar_repos,
+            lambda e: messagebox.showerror("Repositorios", f"No se pudieron buscar los repositorios: {e}")
+        )
+
+        # --- Progreso de carga de commits ---
+        self.progress = ttk.Progressbar(self.top_bar, length=120, mode="determinate")
+        self.progress.pack(side="left", padx=10)
 
         # --- ICON BUTTONS ---
         buttons = [
             (self.icon_push, self.hacer_push),
             (self.icon_refresh, self.actualizar_commits),
-            (self.icon_folder, self.actualizar_commits),
+            (self.icon_folder, self.reescanear_repos),
         ]
         for icon, cmd in buttons:
             btn = tk.Button(
@@ -129,37 +143,62 @@ class CommitsPage(tk.Frame):
             else:
                 self.btn_select = btn
 
+        # push de todos los repos a la vez, con un informe al terminar
+        self.btn_push_todos = tk.Button(
+            self.top_bar,
+            text="Push de todos",
+            command=self.hacer_push_todos,
+            bg=t["bg"],
+            activebackground=t["button_active"],
+            bd=1,
+            relief="raised"
+        )
+        self.btn_push_todos.pack(side="right", padx=5)
+
     # -----------------------------
     #         LÓGICA
     # -----------------------------
     def actualizar_commits(self):
-        commits = cargar_commits(
+        # la carga corre en segundo plano; mostrar_resumen se llama al terminar
+        if not self.selected_repo.get():
+            return  # todavía no hay repos (el escaneo sigue en curso o BASE_DIR está vacío)
+        self.vigilar(self.selected_repo.get())
+        self.progress.config(value=0)
+        cargar_commits(
             self.selected_repo.get(),
             self.tree,
             self.lbl_commits,
             self.lbl_pushes,
-            self.lbl_total_time
+            self.lbl_total_time,
+            on_done=self.mostrar_resumen,
+            progreso=self.mostrar_progreso
         )
-        if not commits:
+
+    def vigilar(self, repo):
+        # recarga la tabla sola cuando llegan commits o pushes nuevos al repo mostrado
+        if repo == self.repo_vigilado:
+            return
+        if self.cancelar_vigilancia:
+            self.cancelar_vigilancia()
+        self.repo_vigilado = repo
+        self.cancelar_vigilancia = vigilar_repo(repo, self.tree, self.actualizar_commits) if repo else None
+
+    def mostrar_progreso(self, hechas, total):
+        self.progress.config(maximum=max(total, 1), value=hechas)
+
+    def mostrar_resumen(self, resumen):
+        self.progress.config(maximum=1, value=1)
+        if resumen["inicio"] is None:
+            self.btn_push.config(state="normal")  # repo sin commits: no hay proyecto finalizado
+            self.btn_update.config(state="normal")
             return
 
-        # --- parse de fechas y mensajes ---
-        parsed_commits = []
-        for c in commits:
-            date = c.get("commit_date") or c.get("date") or datetime.now()
-            msg = c.get("message") or c.get("commit_message") or ""
-            if isinstance(date, str):
-                try:
-                    date = datetime.fromisoformat(date.replace("Z", "+00:00"))
-                except:
-                    date = datetime.now()
-            parsed_commits.append({"date": date, "message": msg})
-
-        fecha_primera = min([p["date"] for p in parsed_commits])
-        # buscar commit con [END]
-        commit_end = next((p for p in reversed(parsed_commits) if "[END]" in p["message"]), None)
+        # --- fechas ya parseadas por el resumen de tareas ---
+        fecha_primera = resumen["inicio"]
+        # commit con [END]
+        commit_end = resumen["commit_end"]
         if commit_end:
-            fecha_fin = commit_end["date"]
+            fecha_fin = commit_end.dt
             proyecto_finalizado = True
         else:
             fecha_fin = datetime.now()
@@ -177,15 +216,56 @@ class CommitsPage(tk.Frame):
             self.btn_push.config(state="normal")
             self.btn_update.config(state="normal")
 
+    def mostrar_repos(self, repositorios):
+        # rellena el combobox con el resultado del escaneo (en el hilo de Tk)
+        primera_vez = str(self.repo_menu.cget("state")) == "disabled"
+        self.repositorios = repositorios
+        self.repo_choices = list(repositorios.values())
+        self.repo_menu.config(values=self.repo_choices, state="readonly")
+        if self.selected_repo.get() not in self.repo_choices:
+            self.selected_repo.set(self.repo_choices[0] if self.repo_choices else "")
+        if primera_vez:
+            marcar("repositorios escaneados")
+            registrar_informe()  # deja en el log el tiempo de arranque hasta tener la ventana completa
+
+    def reescanear_repos(self):
+        # fuerza un nuevo escaneo de BASE_DIR en segundo plano y refresca el combobox al terminar
+        en_segundo_plano(
+            self,
+            lambda: reescanear_repositorios() or {},
+            self.mostrar_repos,
+            lambda e: messagebox.showerror("Repositorios", f"No se pudieron buscar los repositorios: {e}")
+        )
+
     def hacer_push(self):
+        if not self.selected_repo.get():
+            return
+        self.btn_push.config(state="disabled")  # evita encolar el mismo push dos veces mientras corre
         hacer_push(
             self.selected_repo.get(),
             self.tree,
             self.lbl_commits,
             self.lbl_pushes,
-            self.lbl_total_time
+            self.lbl_total_time,
+            on_done=self.mostrar_resumen,  # vuelve a habilitar el push solo si el proyecto sigue abierto
+            al_fallar=lambda e: self.btn_push.config(state="normal")
         )
 
+    def hacer_push_todos(self):
+        if not self.repositorios:
+            return
+        self.btn_push_todos.config(state="disabled")
+        hacer_push_masivo(
+            self.repositorios,
+            self,
+            on_done=self.push_todos_terminado,
+            al_fallar=lambda e: self.btn_push_todos.config(state="normal")
+        )
+
+    def push_todos_terminado(self, lote):
+        self.btn_push_todos.config(state="normal")
+        self.actualizar_commits()  # el repo mostrado puede tener pushes nuevos
+
     # -----------------------------
     #      CAMBIO DE TEMA
     # -----------------------------
@@ -207,7 +287,7 @@ class CommitsPage(tk.Frame):
             lbl.config(bg=t["bg"], fg=t["fg"])
 
         # botones
-        buttons = [self.btn_select, self.btn_update, self.btn_push]
+        buttons = [self.btn_select, self.btn_update, self.btn_push, self.btn_push_todos]
         for btn in buttons:
             btn.config(bg=t["button_bg"], fg=t["fg"], activebackground=t["button_active"], activeforeground=t["fg"])
 
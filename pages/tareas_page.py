@@ -1,11 +1,23 @@
 import tkinter as tk
 
+from config.settings import TASK_ROW_HEIGHT
+from helpers.task_journal import TaskJournal
+
+
 class TareasPage(tk.Frame):
     def __init__(self, parent, controller):
         super().__init__(parent)
         self.controller = controller
 
-        self.tareas = []
+        # Modelo indexado por id: las filas en pantalla se reutilizan y solo se tocan las que cambian.
+        # Se carga del snapshot + diario y cada cambio añade una línea al diario.
+        self.journal = TaskJournal()
+        self.tareas, self.siguiente_id = self.journal.cargar()   # id -> {"id", "text", "done"}
+        self.orden = list(self.tareas)                           # ids en el orden en que se muestran
+
+        # Vista virtualizada: un pool de filas del tamaño de lo visible, reasignadas al hacer scroll
+        self.filas = []             # [{"frame", "texto", "borrar", "clave"}] una por hueco visible
+        self.primera = 0            # Índice (en orden) de la tarea mostrada en el primer hueco
 
         self.build_ui()
         self.apply_theme()  # aplica el tema inicial
@@ -19,12 +31,26 @@ class TareasPage(tk.Frame):
 
         self.task_entry = tk.Entry(entry_frame, width=40)
         self.task_entry.pack(side="left", padx=5)
+        self.task_entry.bind("<Return>", lambda e: self.add_task())
 
         self.add_btn = tk.Button(entry_frame, text="Añadir", command=self.add_task)
         self.add_btn.pack(side="left", padx=5)
 
-        self.tasks_frame = tk.Frame(self)
-        self.tasks_frame.pack(pady=15, fill="x")
+        # Contenedor de la lista + scrollbar; las filas se colocan con place() dentro de tasks_frame
+        self.list_frame = tk.Frame(self)
+        self.list_frame.pack(pady=15, fill="both", expand=True)
+
+        self.scrollbar = tk.Scrollbar(self.list_frame, orient="vertical", command=self.desplazar)
+        self.scrollbar.pack(side="right", fill="y")
+
+        self.tasks_frame = tk.Frame(self.list_frame)
+        self.tasks_frame.pack(side="left", fill="both", expand=True)
+        self.tasks_frame.bind("<Configure>", lambda e: self.ajustar_huecos(e.height))
+
+        for w in (self.tasks_frame, self.scrollbar):
+            w.bind("<MouseWheel>", self.rueda)                          # Windows / macOS
+            w.bind("<Button-4>", lambda e: self.mover(-1))              # Linux
+            w.bind("<Button-5>", lambda e: self.mover(1))
 
     # -----------------------------
     #           LÓGICA
@@ -32,51 +58,130 @@ class TareasPage(tk.Frame):
     def add_task(self):
         tarea = self.task_entry.get().strip()
         if tarea:
-            self.tareas.append({"text": tarea, "done": False})
+            task_id = self.siguiente_id
+            self.siguiente_id += 1
+            self.tareas[task_id] = {"id": task_id, "text": tarea, "done": False}
+            self.orden.append(task_id)
+            self.journal.add(self.tareas[task_id])
+            self.guardar()
             self.task_entry.delete(0, tk.END)
-            self.render_tasks()
+            self.mover(len(self.orden))                                 # Lleva la vista al final para ver la tarea nueva
+
+    def toggle_task(self, task_id):
+        tarea = self.tareas[task_id]
+        tarea["done"] = not tarea["done"]
+        self.journal.toggle(tarea)
+        self.guardar()
+        self.render_tasks()                                             # Solo cambia el texto de su fila
+
+    def delete_task(self, task_id):
+        del self.tareas[task_id]
+        self.orden.remove(task_id)
+        self.journal.delete(task_id)
+        self.guardar()
+        self.render_tasks()
+
+    def guardar(self):
+        # el diario ya tiene el cambio; cada cierto número de cambios se compacta en un snapshot
+        self.journal.quizas_compactar(self.tareas, self.siguiente_id)
 
-    def toggle_task(self, index):
-        self.tareas[index]["done"] = not self.tareas[index]["done"]
+    # -----------------------------
+    #      VISTA VIRTUALIZADA
+    # -----------------------------
+    def crear_fila(self, hueco):                                        # Crea los widgets de un hueco del pool (una vez)
+        t = self.controller.themes[self.controller.theme]
+        row = tk.Frame(self.tasks_frame, bg=t["bg"])
+
+        texto = tk.Button(
+            row,
+            command=lambda: self.accion(hueco, self.toggle_task),
+            relief="flat",
+            anchor="w"
+        )
+        texto.pack(side="left", fill="x", expand=True, padx=5)
+
+        borrar = tk.Button(
+            row,
+            text="🗑",
+            command=lambda: self.accion(hueco, self.delete_task),
+            activebackground="red",
+            width=3,
+            relief="flat"
+        )
+        borrar.pack(side="right", padx=5)
+
+        for w in (row, texto, borrar):
+            w.bind("<MouseWheel>", self.rueda)
+            w.bind("<Button-4>", lambda e: self.mover(-1))
+            w.bind("<Button-5>", lambda e: self.mover(1))
+
+        fila = {"frame": row, "texto": texto, "borrar": borrar, "clave": None}
+        self.pintar_fila(fila, t)
+        return fila
+
+    def pintar_fila(self, fila, t):
+        fila["frame"].config(bg=t["bg"])
+        fila["texto"].config(bg=t["button_bg"], fg=t["fg"], activebackground=t["button_active"])
+        fila["borrar"].config(bg=t["button_bg"], fg=t["fg"])
+
+    def ajustar_huecos(self, alto):
+        # tantos huecos como filas caben (+1 parcial); crecer o encoger el pool solo al redimensionar
+        necesarios = max(1, alto // TASK_ROW_HEIGHT + 1)
+        while len(self.filas) < necesarios:
+            self.filas.append(self.crear_fila(len(self.filas)))
+        while len(self.filas) > necesarios:
+            self.filas.pop()["frame"].destroy()
         self.render_tasks()
 
-    def delete_task(self, index):
-        del self.tareas[index]
+    def accion(self, hueco, fn):                                        # Clic en un hueco -> tarea que muestra ahora
+        fila = self.filas[hueco]
+        if fila["clave"] is not None:
+            fn(fila["clave"][0])
+
+    def visibles(self):
+        return max(1, self.tasks_frame.winfo_height() // TASK_ROW_HEIGHT)
+
+    def mover(self, filas):
+        self.primera += filas
         self.render_tasks()
 
-    def render_tasks(self):
-        for w in self.tasks_frame.winfo_children():
-            w.destroy()
+    def rueda(self, event):
+        self.mover(-1 if event.delta > 0 else 1)
 
-        t = self.controller.themes[self.controller.theme]
+    def desplazar(self, *args):                                         # Protocolo de la Scrollbar: moveto / scroll
+        if args[0] == "moveto":
+            self.primera = int(float(args[1]) * len(self.orden))
+        elif args[0] == "scroll":
+            paso = self.visibles() if args[2] == "pages" else 1
+            self.primera += int(args[1]) * paso
+        self.render_tasks()
 
-        for i, tarea in enumerate(self.tareas):
-            row = tk.Frame(self.tasks_frame, bg=t["bg"])
-            row.pack(fill="x", pady=3)
-
-            texto = f"✔ {tarea['text']}" if tarea["done"] else tarea["text"]
-
-            tk.Button(
-                row,
-                text=texto,
-                command=lambda i=i: self.toggle_task(i),
-                bg=t["button_bg"],
-                fg=t["fg"],
-                activebackground=t["button_active"],
-                relief="flat",
-                anchor="w"
-            ).pack(side="left", fill="x", expand=True, padx=5)
-
-            tk.Button(
-                row,
-                text="🗑",
-                command=lambda i=i: self.delete_task(i),
-                bg=t["button_bg"],
-                fg=t["fg"],
-                activebackground="red",
-                width=3,
-                relief="flat"
-            ).pack(side="right", padx=5)
+    def render_tasks(self):
+        """
+        Reasigna los huecos visibles a las tareas desde self.primera. Cada hueco
+        guarda la clave (id, texto, hecha) que muestra y solo se reconfigura si cambia.
+        """
+        total = len(self.orden)
+        self.primera = max(0, min(self.primera, total - self.visibles()))
+
+        for hueco, fila in enumerate(self.filas):
+            i = self.primera + hueco
+            if i < total:
+                tarea = self.tareas[self.orden[i]]
+                clave = (tarea["id"], tarea["text"], tarea["done"])
+                if fila["clave"] is None:
+                    fila["frame"].place(x=0, y=hueco * TASK_ROW_HEIGHT, relwidth=1, height=TASK_ROW_HEIGHT)
+                if clave != fila["clave"]:
+                    fila["texto"].config(text=f"✔ {tarea['text']}" if tarea["done"] else tarea["text"])
+                    fila["clave"] = clave
+            elif fila["clave"] is not None:
+                fila["frame"].place_forget()                            # Hueco sobrante al final de la lista
+                fila["clave"] = None
+
+        if total:
+            self.scrollbar.set(self.primera / total, min(1.0, (self.primera + self.visibles()) / total))
+        else:
+            self.scrollbar.set(0, 1)
 
     # -----------------------------
     #      CAMBIO DE TEMA
@@ -94,6 +199,7 @@ class TareasPage(tk.Frame):
                     w.config(bg=t["bg"])
                 except:
                     pass
+        self.tasks_frame.config(bg=t["bg"])
 
         self.task_entry.config(bg="white" if self.controller.theme == "light" else "#252526",
                                fg=t["fg"])
@@ -103,4 +209,6 @@ class TareasPage(tk.Frame):
             activebackground=t["button_active"]
         )
 
-        self.render_tasks()
+        # solo se recolorean los huecos existentes; no se reconstruye ninguna fila
+        for fila in self.filas:
+            self.pintar_fila(fila, t)
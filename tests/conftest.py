@@ -0,0 +1,35 @@
+import os
+import sys
+import subprocess
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))   # Importar como la app: desde la raíz
+
+
+class RepoPrueba:
+    """Repo git temporal con fechas de commit controladas para los tests."""
+
+    def __init__(self, path):
+        self.path = str(path)
+        os.makedirs(self.path, exist_ok=True)
+        self.git("init", "-q", "-b", "main")
+
+    def git(self, *args, fecha=None):
+        env = dict(
+            os.environ,
+            GIT_AUTHOR_NAME="test", GIT_AUTHOR_EMAIL="test@example.com",
+            GIT_COMMITTER_NAME="test", GIT_COMMITTER_EMAIL="test@example.com",
+        )
+        if fecha:
+            env["GIT_AUTHOR_DATE"] = env["GIT_COMMITTER_DATE"] = fecha
+        return subprocess.check_output(["git", "-C", self.path, *args], env=env, text=True).strip()
+
+    def commit(self, mensaje, fecha="2024-01-01T10:00:00+00:00"):
+        self.git("commit", "-q", "--allow-empty", "-m", mensaje, fecha=fecha)
+        return self.git("rev-parse", "HEAD")
+
+
+@pytest.fixture
+def repo(tmp_path):
+    return RepoPrueba(tmp_path / "repo")
@@ -0,0 +1,36 @@
+from git_utils import commit_cache
+from git_utils.git_operations import get_local_commits
+
+
+def _shas(commits):
+    return [c.sha for c in commits]
+
+
+def test_avance_lineal_anade_tramo(repo):
+    repo.commit("a", "2024-01-01T10:00:00+00:00")
+    assert _shas(commit_cache.get_cached_commits(repo.path)) == _shas(get_local_commits(repo.path))
+    repo.commit("b", "2024-01-02T10:00:00+00:00")
+    repo.commit("c", "2024-01-03T10:00:00+00:00")
+    commit_cache._cache.memoria.clear()                # Obliga a pasar por el fichero
+
+    assert _shas(commit_cache.get_cached_commits(repo.path)) == _shas(get_local_commits(repo.path))
+    with open(commit_cache._cache_path(repo.path), encoding="utf-8") as f:
+        assert sum('"head"' in linea for linea in f) == 2   # Un tramo por avance, sin reescribir el primero
+    commit_cache._cache.memoria.clear()
+    assert _shas(commit_cache.get_cached_commits(repo.path)) == _shas(get_local_commits(repo.path))
+
+
+def test_merge_con_fechas_antiguas_mantiene_orden_de_git_log(repo):
+    repo.commit("a", "2024-01-01T10:00:00+00:00")
+    repo.git("checkout", "-q", "-b", "rama")
+    repo.commit("r1", "2024-01-02T10:00:00+00:00")
+    repo.commit("r2", "2024-01-05T10:00:00+00:00")
+    repo.git("checkout", "-q", "main")
+    repo.commit("m1", "2024-01-03T10:00:00+00:00")
+    assert _shas(commit_cache.get_cached_commits(repo.path)) == _shas(get_local_commits(repo.path))
+
+    repo.git("merge", "-q", "--no-ff", "rama", "-m", "merge", fecha="2024-01-06T10:00:00+00:00")
+    esperado = _shas(get_local_commits(repo.path))   # merge, r2, m1, r1, a
+    assert _shas(commit_cache.get_cached_commits(repo.path)) == esperado
+    commit_cache._cache.memoria.clear()
+    assert _shas(commit_cache.get_cached_commits(repo.path)) == esperado
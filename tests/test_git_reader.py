@@ -0,0 +1,78 @@
+import pytest
+
+from git_utils import git_operations, git_reader
+
+
+def _commits(repo_path, backend, rev_range=None, monkeypatch=None):
+    monkeypatch.setattr(git_operations, "GIT_BACKEND", backend)
+    return [(c.sha, c.ts, c.tz, c.message) for c in git_operations.iter_local_commits(repo_path, rev_range)]
+
+
+@pytest.fixture
+def historia(repo):
+    """Ramas con merge, zonas horarias distintas, relojes desordenados, packs y objetos sueltos."""
+    repo.commit("+inicio", "2024-01-01T09:00:00+02:00")
+    base = repo.commit("-inicio", "2024-01-01T11:30:00-05:30")
+    repo.git("checkout", "-q", "-b", "rama")
+    repo.commit("en rama 1", "2024-01-02T08:00:00+00:00")
+    repo.commit("en rama 2 (reloj atrasado)", "2023-12-31T23:00:00+01:00")
+    repo.git("checkout", "-q", "main")
+    repo.commit("en main", "2024-01-03T12:00:00+09:00")
+    repo.git("merge", "-q", "--no-ff", "rama", "-m", "Merge rama", fecha="2024-01-04T10:00:00+00:00")
+    repo.git("gc", "-q", "--aggressive")                  # Packfile (con deltas) y packed-refs
+    repo.commit("suelto tras gc ñ áé", "2024-01-05T10:00:00+00:00")
+    repo.commit("[END]", "2024-01-06T10:00:00+00:00")
+    return repo, base
+
+
+def test_lector_python_igual_que_git_log(historia, monkeypatch):
+    repo, _ = historia
+    esperado = _commits(repo.path, "subprocess", monkeypatch=monkeypatch)
+    assert len(esperado) == 8
+    assert _commits(repo.path, "python", monkeypatch=monkeypatch) == esperado
+
+
+def test_lector_python_igual_que_git_log_en_rango(historia, monkeypatch):
+    repo, base = historia
+    rango = f"{base}..HEAD"
+    esperado = _commits(repo.path, "subprocess", rango, monkeypatch)
+    assert esperado
+    assert _commits(repo.path, "python", rango, monkeypatch) == esperado
+
+
+def test_fecha_iso_igual_que_git(historia, monkeypatch):
+    repo, _ = historia
+    monkeypatch.setattr(git_operations, "GIT_BACKEND", "python")
+    fechas = repo.git("log", "--pretty=format:%cI").splitlines()
+    assert [c.commit_date for c in git_operations.iter_local_commits(repo.path)] == fechas
+
+
+def test_repo_no_soportado_lanza_error(tmp_path):
+    with pytest.raises(git_reader.GitReaderError):
+        list(git_reader.iter_commits(str(tmp_path)))
+
+
+def test_fallo_a_mitad_del_recorrido_usa_git_log(historia, monkeypatch):
+    repo, _ = historia
+    esperado = _commits(repo.path, "subprocess", monkeypatch=monkeypatch)
+    leer_commit = git_reader.RepoReader.leer_commit
+    leidos = []
+
+    def leer_con_fallo(self, sha):               # Los primeros commits se leen bien; luego un pack "corrupto"
+        leidos.append(sha)
+        if len(leidos) > 3:
+            raise git_reader.zlib.error("stream corrupto")
+        return leer_commit(self, sha)
+
+    monkeypatch.setattr(git_reader.RepoReader, "leer_commit", leer_con_fallo)
+    assert _commits(repo.path, "python", monkeypatch=monkeypatch) == esperado
+    assert len(leidos) > 3
+
+
+def test_pack_vacio_usa_git_log(historia, monkeypatch):
+    repo, _ = historia
+    esperado = _commits(repo.path, "subprocess", monkeypatch=monkeypatch)
+    pack = f"{repo.path}/.git/objects/pack/pack-{'0' * 40}"
+    open(f"{pack}.idx", "wb").close()            # mmap de un fichero vacío lanza ValueError
+    open(f"{pack}.pack", "wb").close()
+    assert _commits(repo.path, "python", monkeypatch=monkeypatch) == esperado
@@ -0,0 +1,31 @@
+import main
+
+
+def test_pagina_de_error_no_se_revalida(repo, monkeypatch):
+    repo.commit("inicio")
+    monkeypatch.setattr(main, "obtener_repositorios", lambda: {"r1": repo.path})
+    original = main.calcular_datos_repo
+    fallos = [RuntimeError("transitorio")]
+
+    def calcular_con_fallo(selected_repo):       # Falla la primera vez y luego se recupera
+        if fallos:
+            raise fallos.pop()
+        return original(selected_repo)
+
+    monkeypatch.setattr(main, "calcular_datos_repo", calcular_con_fallo)
+    cliente = main.app.test_client()
+
+    error = cliente.get("/", query_string={"repo": repo.path})
+    assert error.status_code == 200
+    assert b"transitorio" in error.data
+    assert error.headers.get("ETag") is None
+    assert error.headers["Cache-Control"] == "no-store"
+
+    # Sin ETag de la página de error, la siguiente petición se genera de nuevo con el repo ya recuperado
+    recuperada = cliente.get("/", query_string={"repo": repo.path})
+    assert recuperada.status_code == 200
+    assert b"transitorio" not in recuperada.data
+    etag = recuperada.headers["ETag"]
+
+    repetida = cliente.get("/", query_string={"repo": repo.path}, headers={"If-None-Match": etag})
+    assert repetida.status_code == 304
@@ -0,0 +1,87 @@
+import os
+
+from helpers.task_journal import TaskJournal
+
+
+def _tarea(task_id, text, done=False):
+    return {"id": task_id, "text": text, "done": done}
+
+
+def _recargar(carpeta, compactar_cada=1000):
+    journal = TaskJournal(str(carpeta), compactar_cada)
+    tareas, siguiente = journal.cargar()
+    journal.cerrar()
+    return tareas, siguiente
+
+
+def test_reaplica_el_diario(tmp_path):
+    journal = TaskJournal(str(tmp_path))
+    journal.add(_tarea(0, "uno"))
+    journal.add(_tarea(1, "dos"))
+    journal.add(_tarea(2, "tres"))
+    journal.toggle(_tarea(1, "dos", True))
+    journal.delete(0)
+    journal.cerrar()
+
+    tareas, siguiente = _recargar(tmp_path)
+    assert list(tareas) == [1, 2]
+    assert tareas[1] == _tarea(1, "dos", True)
+    assert siguiente == 3
+
+
+def test_compactar_conserva_estado_y_vacia_diario(tmp_path):
+    journal = TaskJournal(str(tmp_path), compactar_cada=3)
+    tareas = {}
+    for i in range(5):
+        tareas[i] = _tarea(i, f"t{i}")
+        journal.add(tareas[i])
+        journal.quizas_compactar(tareas, i + 1)
+    tareas[4]["done"] = True
+    journal.toggle(tareas[4])
+    journal.cerrar()
+
+    assert os.path.getsize(journal.journal_path) > 0          # Solo lo posterior al último snapshot
+    assert _recargar(tmp_path) == (tareas, 5)
+
+
+def test_id_borrado_no_se_reutiliza(tmp_path):
+    journal = TaskJournal(str(tmp_path), compactar_cada=2)
+    tareas = {0: _tarea(0, "a"), 1: _tarea(1, "b")}
+    journal.add(tareas[0])
+    journal.add(tareas[1])
+    del tareas[1]
+    journal.delete(1)
+    journal.compactar(tareas, 2)
+    journal.cerrar()
+    assert _recargar(tmp_path) == (tareas, 2)
+
+
+def test_linea_cortada_no_rompe_la_siguiente(tmp_path):
+    journal = TaskJournal(str(tmp_path))
+    journal.add(_tarea(0, "completa"))
+    journal.cerrar()
+    with open(journal.journal_path, "a", encoding="utf-8") as f:
+        f.write('{"op": "add", "id": 1, "te')                # Cierre inesperado a mitad de línea
+
+    journal = TaskJournal(str(tmp_path))
+    journal.cargar()
+    journal.add(_tarea(2, "después"))
+    journal.cerrar()
+
+    tareas, siguiente = _recargar(tmp_path)
+    assert list(tareas) == [0, 2]
+    assert siguiente == 3
+
+
+def test_reaplicar_diario_ya_compactado_es_inocuo(tmp_path):
+    journal = TaskJournal(str(tmp_path))
+    tareas = {0: _tarea(0, "a", True)}
+    journal.add(_tarea(0, "a"))
+    journal.toggle(tareas[0])
+    journal.cerrar()
+    with open(journal.journal_path, encoding="utf-8") as f:
+        diario = f.read()
+    journal.compactar(tareas, 1)
+    with open(journal.journal_path, "w", encoding="utf-8") as f:
+        f.write(diario)                                     # Corte entre el snapshot y vaciar el diario
+    assert _recargar(tmp_path) == (tareas, 1)
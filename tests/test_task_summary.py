@@ -0,0 +1,56 @@
+from git_utils.git_operations import get_local_commits
+from helpers import task_summary
+from helpers.task_summary import get_task_summary
+from helpers.time_utils import calcular_timeline
+
+
+def _comprobar(repo_path):
+    """El resumen incremental (en memoria y releído de disco) coincide con recalcular toda la historia."""
+    timeline = calcular_timeline(get_local_commits(repo_path))
+    esperado = (
+        timeline["total"],
+        len(timeline["tareas"]),
+        timeline["inicio"],
+        timeline["commit_end"].sha if timeline["commit_end"] else None,
+    )
+    for resumen in (get_task_summary(repo_path), _releido(repo_path)):
+        fin = resumen["commit_end"]
+        assert (resumen["total"], resumen["tareas"], resumen["inicio"], fin.sha if fin else None) == esperado
+
+
+def _releido(repo_path):
+    task_summary._cache.memoria.pop(repo_path, None)            # Obliga a leer el fichero de .git
+    return get_task_summary(repo_path)
+
+
+def test_pliega_commits_nuevos_con_tarea_abierta(repo):
+    repo.commit("+a", "2024-01-01T10:00:00+00:00")
+    repo.commit("-a", "2024-01-01T11:00:00+00:00")
+    repo.commit("+b", "2024-01-01T12:00:00+00:00")       # Queda abierta en el checkpoint
+    _comprobar(repo.path)
+
+    repo.commit("-b", "2024-01-01T14:30:00+01:00")
+    repo.commit("+c", "2024-01-02T09:00:00+00:00")
+    repo.commit("-c [END]", "2024-01-02T09:45:00+00:00")
+    _comprobar(repo.path)
+    assert get_task_summary(repo.path)["tareas"] == 3
+
+
+def test_commit_anterior_al_checkpoint_reconstruye(repo):
+    repo.commit("+a", "2024-01-05T10:00:00+00:00")
+    _comprobar(repo.path)
+    repo.commit("-a", "2024-01-01T10:00:00+00:00")       # Reloj atrasado: cambia el orden por fecha
+    repo.commit("+b", "2024-01-06T10:00:00+00:00")
+    repo.commit("-b", "2024-01-06T12:00:00+00:00")
+    _comprobar(repo.path)
+
+
+def test_historia_reescrita_reconstruye(repo):
+    repo.commit("+a", "2024-01-01T10:00:00+00:00")
+    repo.commit("-a", "2024-01-01T11:00:00+00:00")
+    repo.commit("+b", "2024-01-01T12:00:00+00:00")
+    repo.commit("-b", "2024-01-01T13:00:00+00:00")
+    _comprobar(repo.path)
+    repo.git("reset", "-q", "--hard", "HEAD~2")
+    repo.commit("-a otra vez", "2024-01-01T15:00:00+00:00")
+    _comprobar(repo.path)
@@ -0,0 +1,76 @@
+"""
+Entrada de producción de MetHub (main.py sigue siendo el modo desarrollo).
+
+Uso:
+    python wsgi.py --workers 4 --threads 8 --bind 0.0.0.0:8000
+    gunicorn -w 4 -k gthread --threads 8 wsgi:app
+
+En Linux/macOS usa gunicorn con varios procesos (worker gthread, para que las
+conexiones SSE no bloqueen el proceso). En Windows, donde gunicorn no existe,
+usa waitress: un solo proceso con WEB_THREADS hilos.
+
+Los procesos no duplican la historia: el CommitStore de cada repo se guarda
+una vez en SHARED_CACHE_DIR y todos lo abren con mmap.
+"""
+import logging
+import argparse
+
+from main import app
+from config.settings import WEB_BIND, WEB_WORKERS, WEB_THREADS
+
+_log = logging.getLogger("methub.wsgi")
+
+try:
+    from gunicorn.app.base import BaseApplication
+except ImportError:                                  # gunicorn es opcional (y no funciona en Windows)
+    BaseApplication = None
+
+try:
+    import waitress
+except ImportError:
+    waitress = None
+
+
+if BaseApplication is not None:
+    class ServidorGunicorn(BaseApplication):
+        def __init__(self, aplicacion, opciones):
+            self.aplicacion = aplicacion
+            self.opciones = opciones
+            super().__init__()
+
+        def load_config(self):
+            for clave, valor in self.opciones.items():
+                self.cfg.set(clave, valor)
+
+        def load(self):
+            return self.aplicacion
+
+
+def servir(bind=WEB_BIND, workers=WEB_WORKERS, threads=WEB_THREADS):
+    if BaseApplication is not None:
+        ServidorGunicorn(app, {
+            "bind": bind,
+            "workers": workers,
+            "threads": threads,
+            "worker_class": "gthread",
+            "timeout": 120,                          # Un git log en frío de un repo enorme puede tardar
+        }).run()
+    elif waitress is not None:
+        if workers > 1:
+            _log.warning("waitress no usa varios procesos: se ignora --workers %d y se usan %d hilos", workers, threads)
+        waitress.serve(app, listen=bind, threads=threads)
+    else:
+        raise SystemExit("Modo producción: instala gunicorn (Linux/macOS) o waitress (Windows)")
+
+
+def ejecutar(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--bind", default=WEB_BIND, help="host:puerto donde escuchar")
+    parser.add_argument("--workers", type=int, default=WEB_WORKERS, help="Procesos del servidor")
+    parser.add_argument("--threads", type=int, default=WEB_THREADS, help="Hilos por proceso")
+    args = parser.parse_args(argv)
+    servir(args.bind, max(1, args.workers), max(1, args.threads))
+
+
+if __name__ == "__main__":
+    ejecutar()